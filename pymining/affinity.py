@@ -0,0 +1,208 @@
+'''Artist affinity: which artists are listened to by the same users.
+
+Pairs of artists are counted, scored, and the most similar artists of each
+artist are kept in bounded heaps::
+
+    >>> transactions = affinity.read_user_artists('user_artists.txt')
+    >>> table = affinity.similar_artists(transactions, min_support=50,
+    ...     top_n=10, score='lift')
+    >>> table['Radiohead']
+    [(4.2, 'Thom Yorke'), (3.1, 'Portishead'), ...]
+
+The transactions are streamed twice, to count the artists and then the pairs
+of frequent artists, and the pairs are scored one at a time, so memory
+depends on the number of artists, pairs of frequent artists listened to by a
+same user and artists times top_n.
+
+Run ``python -m pymining.affinity --help`` for the command line interface.
+'''
+from collections import defaultdict, namedtuple
+from collections.abc import Iterator
+import heapq
+from itertools import combinations
+import sys
+
+from pymining import arrays
+
+
+PairScore = namedtuple('PairScore', 'first second support confidence '
+        'reverse_confidence lift jaccard')
+PairScore.__doc__ = '''Scores of a pair of artists. confidence is
+P(second | first) and reverse_confidence is P(first | second).'''
+
+SCORES = ('support', 'confidence', 'lift', 'jaccard')
+
+
+def parse_lines(lines, separator=','):
+    '''Yields the artists of each line of comma separated artists. Blank
+       lines are skipped.
+
+       :param lines: an iterable of strings, e.g.,
+        'Radiohead,Morrissey,Blur'.
+       :rtype: a generator of tuples of artists.
+    '''
+    for line in lines:
+        artists = tuple(artist.strip() for artist in line.split(separator)
+                if artist.strip())
+        if artists:
+            yield artists
+
+
+class UserArtists(object):
+    '''The transactions of a file with one line of artists per user. It
+       can be iterated several times.'''
+
+    def __init__(self, path, separator=','):
+        self.path = path
+        self.separator = separator
+
+    def __iter__(self):
+        with open(self.path) as input_file:
+            for artists in parse_lines(input_file, self.separator):
+                yield artists
+
+
+def read_user_artists(path, separator=','):
+    '''Returns the transactions of a file with one line of artists per
+       user.'''
+    return UserArtists(path, separator)
+
+
+def mine_pairs(transactions, min_support=2, key_func=None):
+    '''Finds the pairs of artists listened to by at least `min_support`
+       users.
+
+       The transactions are read twice, one at a time: the frequency of
+       each artist first, then the pairs of frequent artists. An iterator,
+       which can only be read once, is first copied into a list.
+
+       :param transactions: an iterable of sequences of artists, e.g., an
+        `eventlog.EventLog`, or a user x artist matrix (see
+        `pymining.arrays`).
+       :param min_support: the minimal support of a pair.
+       :param key_func: a function that returns a key for an artist (for a
+        column index if transactions is a matrix).
+       :rtype: ({pair: support}, {artist: support}, number of users).
+    '''
+    if arrays.is_matrix(transactions):
+        return arrays.item_and_pair_counts(transactions, min_support,
+                key_func)
+    if isinstance(transactions, Iterator):
+        transactions = list(transactions)
+
+    frequencies = defaultdict(int)
+    records = 0
+    for artists in _artist_sets(transactions, key_func):
+        records += 1
+        for artist in artists:
+            frequencies[artist] += 1
+
+    frequent = [artist for (artist, support) in frequencies.items() if
+            support >= min_support]
+    codes = {artist: code for (code, artist) in enumerate(frequent)}
+    size = len(frequent)
+    # {first code * size + second code: support}, first code < second code.
+    counts = defaultdict(int)
+    for artists in _artist_sets(transactions, key_func):
+        for (first, second) in combinations(sorted(codes[artist] for
+                artist in artists if artist in codes), 2):
+            counts[first * size + second] += 1
+
+    pairs = {}
+    for (pair, support) in counts.items():
+        if support >= min_support:
+            (first, second) = divmod(pair, size)
+            pairs[frozenset((frequent[first], frequent[second]))] = support
+    return (pairs, frequencies, records)
+
+
+def _artist_sets(transactions, key_func):
+    # An artist listed twice by a user is counted once.
+    for transaction in transactions:
+        if key_func is not None:
+            transaction = map(key_func, transaction)
+        yield set(transaction)
+
+
+def score_pairs(pairs, frequencies, total):
+    '''Yields the scores of each pair.
+
+       :param pairs: {pair: support}, as returned by `mine_pairs`.
+       :param frequencies: {artist: support}.
+       :param total: the number of users.
+       :rtype: a generator of `PairScore`.
+    '''
+    for (pair, support) in pairs.items():
+        (first, second) = sorted(pair)
+        (first_support, second_support) = (frequencies[first],
+                frequencies[second])
+        yield PairScore(first, second, support,
+                float(support) / first_support,
+                float(support) / second_support,
+                float(support) * total / (first_support * second_support),
+                float(support) / (first_support + second_support - support))
+
+
+def top_similar(scores, top_n=10, score='lift'):
+    '''Builds the table of the `top_n` most similar artists of each artist.
+
+       :param scores: an iterable of `PairScore`.
+       :param top_n: the number of similar artists to keep per artist.
+       :param score: 'support', 'confidence', 'lift' or 'jaccard'. With
+        'confidence', the artists similar to A are ranked by P(B | A).
+       :rtype: {artist: [(score, similar artist)]}, best first.
+    '''
+    if score not in SCORES:
+        raise ValueError('unknown score: {0}'.format(score))
+    # {artist: min heap of (score, other)}
+    heaps = {}
+    for pair_score in scores:
+        if score == 'confidence':
+            values = (pair_score.confidence, pair_score.reverse_confidence)
+        else:
+            values = (getattr(pair_score, score),) * 2
+        for (artist, other, value) in ((pair_score.first,
+                pair_score.second, values[0]), (pair_score.second,
+                    pair_score.first, values[1])):
+            heap = heaps.setdefault(artist, [])
+            if len(heap) < top_n:
+                heapq.heappush(heap, (value, other))
+            elif (value, other) > heap[0]:
+                heapq.heapreplace(heap, (value, other))
+    return {artist: sorted(heap, reverse=True) for (artist, heap) in
+            heaps.items()}
+
+
+def similar_artists(transactions, min_support=2, top_n=10, score='lift',
+        key_func=None):
+    '''Mines, scores and ranks the pairs of artists of transactions.
+
+       :rtype: {artist: [(score, similar artist)]}, best first.
+    '''
+    (pairs, frequencies, total) = mine_pairs(transactions, min_support,
+            key_func)
+    return top_similar(score_pairs(pairs, frequencies, total), top_n, score)
+
+
+def main(args=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Finds the most similar '
+            'artists of each artist, from a file with one line of comma '
+            'separated artists per user.')
+    parser.add_argument('path')
+    parser.add_argument('--min-support', type=int, default=2)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--score', choices=SCORES, default='lift')
+    parser.add_argument('--separator', default=',')
+    options = parser.parse_args(args)
+
+    table = similar_artists(read_user_artists(options.path,
+        options.separator), options.min_support, options.top, options.score)
+    for artist in sorted(table):
+        print('{0}: {1}'.format(artist, ', '.join('{0} ({1:.3g})'.format(
+            other, value) for (value, other) in table[artist])))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+'''asyncio entry points for the miners (Python 3.7+).
+
+Mining runs in an executor so that the event loop keeps serving other
+requests. At most `max_jobs` mining jobs run at once, and cancelling the
+awaiting task stops the worker the next time it checks its budget::
+
+    >>> async with AsyncMiner(max_jobs=2) as miner:
+    ...     report = await miner.relim(transactions, 2)
+    ...     async for (itemset, support) in miner.iter_relim(transactions, 2):
+    ...         print(itemset, support)
+
+With the default thread pool, the loop shares the interpreter with the
+workers, which release the GIL every `sys.getswitchinterval()` seconds. Pass
+a `concurrent.futures.ProcessPoolExecutor` to isolate the loop completely:
+results are then sent back at the end of a job, and cancellation only stops
+the jobs that have not started.
+'''
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import threading
+import weakref
+
+from pymining import assocrules, itemmining
+from pymining import budget as _budget
+
+
+_DONE = object()
+
+
+class _StreamingReport(_budget.ItemsetReport):
+    # Sends each item set to the event loop as the miner finds it.
+
+    def __init__(self, send):
+        super(_StreamingReport, self).__init__()
+        self._send = send
+
+    def __setitem__(self, itemset, support):
+        dict.__setitem__(self, itemset, support)
+        self._send((itemset, support))
+
+
+class AsyncMiner(object):
+    '''Runs the miners in an executor and awaits their results.'''
+
+    def __init__(self, executor=None, max_jobs=2, check_interval=64,
+            queue_size=256):
+        '''
+           :param executor: a `concurrent.futures.Executor`. Default to a
+            thread pool of `max_jobs` threads, which `close` shuts down.
+           :param max_jobs: the maximal number of mining jobs running at
+            once in an event loop. Other jobs wait for their turn without
+            blocking the loop.
+           :param check_interval: the number of item sets found between two
+            checks for cancellation.
+           :param queue_size: the number of item sets that `iter_relim`
+            buffers. The worker waits when the consumer is behind.
+        '''
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_jobs)
+        self.executor = executor
+        self.max_jobs = max_jobs
+        self.check_interval = check_interval
+        self.queue_size = queue_size
+        # The cancellation events of the running iter_relim workers.
+        self._streams = set()
+        # {event loop: semaphore}. asyncio primitives belong to one loop.
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def close(self, wait=True):
+        '''Stops the `iter_relim` workers, whose consumer may have left
+           the loop without closing the generator yet, and shuts down the
+           executor if it was created by this miner.'''
+        for cancel in list(self._streams):
+            cancel.set()
+        if self._owns_executor:
+            self.executor.shutdown(wait=wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # Waiting for the workers must not block the loop.
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def _in_process(self):
+        return isinstance(self.executor, ProcessPoolExecutor)
+
+    async def _submit(self, func, *args):
+        # The job slot is released when the worker returns, not when the
+        # awaiting task is cancelled, so max_jobs bounds the running
+        # workers.
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_jobs)
+            self._semaphores[loop] = semaphore
+        await semaphore.acquire()
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+        future.add_done_callback(
+                lambda _: _call_soon(loop, semaphore.release))
+        return future
+
+    async def _run(self, func, args, timeout, max_results):
+        # A threading.Event cannot be shared with another process.
+        cancel = None if self._in_process() else threading.Event()
+        future = await self._submit(func, *(args + (self._budget(cancel,
+            timeout, max_results),)))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if cancel is not None:
+                cancel.set()
+            raise
+
+    def _budget(self, cancel, timeout, max_results):
+        if cancel is None and timeout is None and max_results is None:
+            return None
+        return _budget.Budget(timeout=timeout, max_results=max_results,
+                cancel=cancel, check_interval=self.check_interval)
+
+    async def relim(self, transactions, min_support=2, key_func=None,
+            timeout=None, max_results=None):
+        '''Finds the frequent item sets of transactions with
+           `itemmining.relim`.
+
+           :param timeout: stop the search after this number of seconds.
+           :param max_results: stop the search after this number of item
+            sets.
+           :rtype: a `budget.ItemsetReport` ({itemset: support}), or a dict
+            if the executor is a process pool and there is no limit.
+        '''
+        return await self._run(_relim_job, (transactions, min_support,
+            key_func), timeout, max_results)
+
+    async def mine(self, transactions, min_support=2, timeout=None,
+            max_results=None, **kwargs):
+        '''Finds the frequent item sets of transactions with
+           `itemmining.mine`, which picks the fastest engine.
+
+           :param kwargs: passed to `itemmining.mine`.
+        '''
+        return await self._run(_mine_job, (transactions, min_support,
+            kwargs), timeout, max_results)
+
+    async def mine_assoc_rules(self, isets, min_support=2,
+            min_confidence=0.5):
+        '''Runs `assocrules.mine_assoc_rules` in the executor.'''
+        future = await self._submit(assocrules.mine_assoc_rules, isets,
+                min_support, min_confidence)
+        return await asyncio.wrap_future(future)
+
+    async def iter_relim(self, transactions, min_support=2, key_func=None,
+            timeout=None, max_results=None):
+        '''Yields the (itemset, support) found by `itemmining.relim` as the
+           search goes. Leaving the loop early stops the worker.'''
+        if self._in_process():
+            report = await self.relim(transactions, min_support, key_func,
+                    timeout, max_results)
+            for result in report.items():
+                yield result
+            return
+
+        loop = asyncio.get_running_loop()
+        # One more slot for _DONE.
+        queue = asyncio.Queue(self.queue_size + 1)
+        # The worker takes a slot per item set and the consumer gives it
+        # back, so at most queue_size item sets wait in the queue.
+        slots = threading.BoundedSemaphore(self.queue_size)
+        cancel = threading.Event()
+        self._streams.add(cancel)
+
+        def send(result):
+            while not slots.acquire(timeout=0.1):
+                if cancel.is_set():
+                    raise _budget.BudgetExceeded(_budget.CANCELLED)
+            if not _call_soon(loop, queue.put_nowait, result):
+                raise _budget.BudgetExceeded(_budget.CANCELLED)
+
+        try:
+            future = await self._submit(_stream_relim_job, transactions,
+                    min_support, key_func, self._budget(cancel, timeout,
+                        max_results), send)
+            # Also sent if the worker fails before mining.
+            future.add_done_callback(
+                    lambda _: _call_soon(loop, queue.put_nowait, _DONE))
+            while True:
+                result = await queue.get()
+                if result is _DONE:
+                    break
+                slots.release()
+                yield result
+            # Raises the exception of the worker, if any.
+            await asyncio.wrap_future(future)
+        finally:
+            cancel.set()
+            self._streams.discard(cancel)
+
+
+def _call_soon(loop, callback, *args):
+    # Schedules a callback from a worker. Returns False if the loop was
+    # closed, i.e., nobody waits for the worker anymore.
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        return False
+    return True
+
+
+def _relim_job(transactions, min_support, key_func, budget):
+    relim_input = itemmining.get_relim_input(transactions, key_func,
+            min_support=min_support)
+    return itemmining.relim(relim_input, min_support, budget=budget)
+
+
+def _mine_job(transactions, min_support, kwargs, budget):
+    return itemmining.mine(transactions, min_support, budget=budget,
+            **kwargs)
+
+
+def _stream_relim_job(transactions, min_support, key_func, budget, send):
+    report = _StreamingReport(send)
+    relim_input = itemmining.get_relim_input(transactions, key_func,
+            min_support=min_support)
+    scratch = itemmining._relim_scratch(relim_input)
+    return _budget.run(budget, lambda: itemmining._relim(scratch, set(),
+        report, min_support, None, budget), report)
@@ -0,0 +1,283 @@
+'''Transactions stored as a user x item incidence matrix (requires numpy).
+
+The item set miners accept, instead of a sequence of transactions:
+
+* a `CSR` pair ``CSR(indptr, indices)`` of 1-D integer arrays: the items of
+  transaction ``i`` are ``indices[indptr[i]:indptr[i + 1]]``. A plain
+  ``(indptr, indices)`` tuple is not accepted, since it cannot be told apart
+  from a list of two transactions,
+* a scipy.sparse matrix (any format with a ``tocsr`` method),
+* a 2-D numpy array, where a non-zero cell means that the item (column) is
+  in the transaction (row).
+
+Items are column indexes. The `key_func` of the miners is called once per
+column to get the key of an item, e.g., ``key_func=artists.__getitem__``.
+Counting, filtering and sorting the items of each transaction are numpy
+operations.
+'''
+from collections import defaultdict, namedtuple
+
+from pymining.compat import numpy
+
+
+CSR = namedtuple('CSR', 'indptr indices')
+CSR.__doc__ = '''Transactions in compressed sparse row format: the items
+of transaction i are indices[indptr[i]:indptr[i + 1]].'''
+
+
+def is_matrix(transactions):
+    '''Returns True if transactions is one of the matrix formats of this
+       module.'''
+    if numpy is None:
+        return False
+    if isinstance(transactions, numpy.ndarray):
+        return transactions.ndim == 2
+    return isinstance(transactions, CSR) or hasattr(transactions, 'tocsr')
+
+
+def _check_csr(indptr, indices):
+    if indptr.ndim != 1 or indices.ndim != 1 or not len(indptr) or \
+            indptr[0] != 0 or indptr[-1] != len(indices) or \
+            (numpy.diff(indptr) < 0).any():
+        raise ValueError('invalid CSR transactions: indptr must start at 0, '
+                'be non-decreasing and end at len(indices)')
+
+
+def _check_numpy():
+    if numpy is None:
+        raise ImportError('matrix transactions require numpy')
+
+
+def _coordinates(matrix):
+    # Returns (rows, columns, row of each item, column of each item), the
+    # items being sorted by row, without duplicates.
+    _check_numpy()
+    if isinstance(matrix, numpy.ndarray):
+        (rows, cols) = numpy.nonzero(matrix)
+        return (matrix.shape[0], matrix.shape[1], rows, cols)
+
+    if hasattr(matrix, 'tocsr'):
+        csr = matrix.tocsr()
+        (indptr, indices) = (numpy.asarray(csr.indptr),
+                numpy.asarray(csr.indices))
+        (row_count, col_count) = csr.shape
+        data = numpy.asarray(csr.data)
+    else:
+        (indptr, indices) = (numpy.asarray(matrix.indptr),
+                numpy.asarray(matrix.indices))
+        _check_csr(indptr, indices)
+        row_count = len(indptr) - 1
+        col_count = int(indices.max()) + 1 if len(indices) else 0
+        data = None
+
+    rows = numpy.repeat(numpy.arange(row_count), numpy.diff(indptr))
+    cols = numpy.asarray(indices, dtype=numpy.int64)
+    if data is not None:
+        # Explicit zeros are not items.
+        present = data != 0
+        (rows, cols) = (rows[present], cols[present])
+    # An item listed twice in a transaction is counted once.
+    order = numpy.lexsort((cols, rows))
+    (rows, cols) = (rows[order], cols[order])
+    if len(cols) > 1:
+        new = numpy.ones(len(cols), dtype=bool)
+        new[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        (rows, cols) = (rows[new], cols[new])
+    return (row_count, col_count, rows, cols)
+
+
+def to_csr(matrix):
+    '''Converts a matrix to a `CSR` pair without explicit zeros or duplicate
+       items.'''
+    (row_count, _, rows, cols) = _coordinates(matrix)
+    indptr = numpy.zeros(row_count + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(rows, minlength=row_count), out=indptr[1:])
+    return CSR(indptr, cols)
+
+
+def row_count(matrix):
+    '''Returns the number of transactions of a matrix.'''
+    if isinstance(matrix, CSR):
+        return len(matrix.indptr) - 1
+    return matrix.shape[0]
+
+
+def split(matrix, chunks):
+    '''Splits the rows of a matrix into contiguous `CSR` chunks of (almost)
+       equal size.'''
+    csr = to_csr(matrix)
+    rows = row_count(csr)
+    chunks = max(1, min(chunks, rows))
+    (size, extra) = divmod(rows, chunks)
+    result = []
+    start = 0
+    for i in range(chunks):
+        end = start + size + (1 if i < extra else 0)
+        (low, high) = (csr.indptr[start], csr.indptr[end])
+        result.append(CSR(csr.indptr[start:end + 1] - low,
+            csr.indices[low:high]))
+        start = end
+    return result
+
+
+def item_frequencies(matrix):
+    '''Returns the number of transactions containing each column, as a numpy
+       array.'''
+    (_, col_count, _, cols) = _coordinates(matrix)
+    return numpy.bincount(cols, minlength=col_count)
+
+
+def _keys(col_count, key_func):
+    if key_func is None:
+        return list(range(col_count))
+    return [key_func(col) for col in range(col_count)]
+
+
+class MatrixBaskets(object):
+    '''The distinct transactions of a matrix, as returned by `ingest`.
+
+       It behaves as the {transaction: count} dict of `itemmining`, but the
+       dict is only built if it is used (e.g., by the dataset statistics):
+       the miners' inputs are built from the arrays by `encode`.
+    '''
+
+    def __init__(self, row_count, rows, cols, keys, counts):
+        self.row_count = row_count
+        self.rows = rows
+        self.cols = cols
+        self.keys = keys
+        self.counts = counts
+        count_list = counts.tolist()
+        # Rank of each column in the (frequency, key) order of the miners.
+        ranked = sorted(range(len(keys)), key=lambda col: (count_list[col],
+            keys[col]))
+        self.rank = numpy.empty(len(keys), dtype=numpy.int64)
+        self.rank[ranked] = numpy.arange(len(keys))
+        self._items = numpy.empty(len(keys), dtype=object)
+        self._items[:] = [(count_list[col], keys[col]) for col in
+                range(len(keys))]
+        self._baskets = None
+
+    def _sorted_rows(self, cols_value, min_support=None, reverse=False):
+        (rows, cols) = (self.rows, self.cols)
+        if min_support:
+            kept = self.counts[cols] >= min_support
+            (rows, cols) = (rows[kept], cols[kept])
+        rank = self.rank[cols]
+        order = numpy.lexsort((-rank if reverse else rank, rows))
+        values = cols_value[cols[order]].tolist()
+        bounds = numpy.zeros(self.row_count + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(rows, minlength=self.row_count),
+                out=bounds[1:])
+        bounds = bounds.tolist()
+        return (values[bounds[i]:bounds[i + 1]] for i in
+                range(self.row_count))
+
+    def encode(self, min_support=None, reverse=False):
+        '''Returns [(sorted ((frequency, key),...), count)] like
+           `itemmining._encode`.'''
+        encoded = defaultdict(int)
+        for seq in self._sorted_rows(self._items, min_support, reverse):
+            if seq:
+                encoded[tuple(seq)] += 1
+        return list(encoded.items())
+
+    def _dict(self):
+        if self._baskets is None:
+            self._baskets = defaultdict(int)
+            keys = numpy.empty(len(self.keys), dtype=object)
+            keys[:] = self.keys
+            for seq in self._sorted_rows(keys):
+                self._baskets[tuple(seq)] += 1
+        return self._baskets
+
+    def items(self):
+        return self._dict().items()
+
+    def values(self):
+        return self._dict().values()
+
+    def __len__(self):
+        return len(self._dict())
+
+
+def ingest(matrix, key_func=None, exclude=None):
+    '''Preprocesses a matrix like `itemmining` preprocesses a sequence of
+       transactions.
+
+       :param matrix: the transactions, in one of the formats of this module.
+       :param key_func: a function that returns a comparable key for a
+        column index.
+       :param exclude: a collection of keys to ignore.
+       :rtype: (`MatrixBaskets`, {key: frequency}, number of rows).
+    '''
+    (row_count, col_count, rows, cols) = _coordinates(matrix)
+    keys = _keys(col_count, key_func)
+    if exclude:
+        excluded = numpy.array([key in exclude for key in keys], dtype=bool)
+        kept = ~excluded[cols]
+        (rows, cols) = (rows[kept], cols[kept])
+
+    counts = numpy.bincount(cols, minlength=col_count)
+    frequencies = defaultdict(int)
+    for col in numpy.nonzero(counts)[0].tolist():
+        frequencies[keys[col]] = int(counts[col])
+    return (MatrixBaskets(row_count, rows, cols, keys, counts), frequencies,
+            row_count)
+
+
+def pair_counts(matrix, min_support=2, key_func=None, block_size=1 << 22):
+    '''Counts the pairs of items appearing together in at least
+       `min_support` transactions, with matrix products over blocks of
+       transactions.
+
+       Only the frequent items are counted, but the counts take
+       (frequent items)^2 floats.
+
+       :param matrix: the transactions, in one of the formats of this module.
+       :param min_support: the minimal support of a pair.
+       :param key_func: a function that returns a key for a column index.
+       :param block_size: the number of cells of a dense block.
+       :rtype: a dict, {frozenset([key1, key2]): support}.
+    '''
+    return item_and_pair_counts(matrix, min_support, key_func,
+            block_size)[0]
+
+
+def item_and_pair_counts(matrix, min_support=2, key_func=None,
+        block_size=1 << 22):
+    '''Like `pair_counts`, but also returns the frequency of each item
+       (the column sums), with one decoding of the matrix.
+
+       :rtype: ({frozenset([key1, key2]): support}, {key: frequency},
+        number of rows).
+    '''
+    (row_count, col_count, rows, cols) = _coordinates(matrix)
+    keys = _keys(col_count, key_func)
+    counts = numpy.bincount(cols, minlength=col_count)
+    frequencies = defaultdict(int)
+    for col in numpy.nonzero(counts)[0].tolist():
+        frequencies[keys[col]] = int(counts[col])
+    frequent = numpy.nonzero(counts >= min_support)[0]
+    size = len(frequent)
+    if size < 2:
+        return ({}, frequencies, row_count)
+    remap = numpy.full(col_count, -1, dtype=numpy.int64)
+    remap[frequent] = numpy.arange(size)
+    kept = remap[cols] >= 0
+    (rows, cols) = (rows[kept], remap[cols[kept]])
+
+    # Floats use BLAS and are exact up to 2 ** 53.
+    pairs = numpy.zeros((size, size))
+    block_rows = max(1, block_size // size)
+    for start in range(0, row_count, block_rows):
+        (low, high) = numpy.searchsorted(rows, [start, start + block_rows])
+        block = numpy.zeros((min(block_rows, row_count - start), size))
+        block[rows[low:high] - start, cols[low:high]] = 1
+        pairs += block.T.dot(block)
+
+    (first, second) = numpy.nonzero(numpy.triu(pairs, 1) >= min_support)
+    pairs = {frozenset((keys[frequent[i]], keys[frequent[j]])):
+            int(pairs[i, j]) for (i, j) in zip(first.tolist(),
+                second.tolist())}
+    return (pairs, frequencies, row_count)
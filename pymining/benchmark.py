@@ -0,0 +1,331 @@
+'''Benchmarks of the mining algorithms.
+
+Each engine is run end to end (preprocessing and mining) on a dataset after
+a few warmup runs. The timings of the repeated runs are summarized by their
+median and interquartile range, and one more run measures the peak memory
+with tracemalloc. Results are plain dicts that can be saved as JSON and
+compared with a baseline to find regressions.
+
+Run ``python -m pymining.benchmark --help`` for the command line interface.
+'''
+from collections import OrderedDict
+import json
+import platform
+import random
+import sys
+from timeit import default_timer
+
+from pymining import itemmining, seqmining, assocrules, perftesting
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def _relim(transactions, support):
+    return itemmining.relim(itemmining.get_relim_input(transactions),
+            support)
+
+
+def _sam(transactions, support):
+    return itemmining.sam(itemmining.get_sam_input(transactions), support)
+
+
+def _fpgrowth_pruning(transactions, support):
+    return itemmining.fpgrowth(itemmining.get_fptree(transactions,
+        min_support=support), support, pruning=True)
+
+
+def _fpgrowth(transactions, support):
+    return itemmining.fpgrowth(itemmining.get_fptree(transactions,
+        min_support=support), support, pruning=False)
+
+
+def _seqmining(transactions, support):
+    return seqmining.freq_seq_enum(transactions, support)
+
+
+def _assocrules(transactions, support):
+    # Item sets are mined once per dataset, outside of the timed runs. The
+    # cache holds the dataset itself: an id could be reused by another one.
+    if _itemsets_cache.get('transactions') is not transactions or \
+            _itemsets_cache.get('support') != support:
+        _itemsets_cache['transactions'] = transactions
+        _itemsets_cache['support'] = support
+        _itemsets_cache['report'] = _relim(transactions, support)
+    return assocrules.mine_assoc_rules(_itemsets_cache['report'], support)
+
+
+_itemsets_cache = {}
+
+
+# {name: function(transactions, support)}. Each function returns the
+# mined patterns.
+ENGINES = OrderedDict([
+    ('relim', _relim),
+    ('sam', _sam),
+    ('fpgrowth_pruning', _fpgrowth_pruning),
+    ('fpgrowth', _fpgrowth),
+    ('seqmining', _seqmining),
+    ('assocrules', _assocrules),
+    ])
+
+
+def _percentile(sorted_values, fraction):
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def measure(func, warmup=1, repeats=5, memory=True):
+    '''Runs `func` `warmup` times, then times `repeats` runs.
+
+       :param func: a function without argument.
+       :param warmup: the number of runs that are not timed.
+       :param repeats: the number of timed runs.
+       :param memory: run once more under tracemalloc to get the peak
+        memory. Ignored if tracemalloc is not available.
+       :rtype: A dict with the timings in seconds (median, iqr, min, max,
+        times), the peak memory in bytes (None if not measured) and the
+        number of results returned by `func`.
+    '''
+    for _ in range(warmup):
+        func()
+
+    times = []
+    result = None
+    for _ in range(max(repeats, 1)):
+        start = default_timer()
+        result = func()
+        times.append(default_timer() - start)
+
+    peak_memory = None
+    if memory and tracemalloc is not None and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        try:
+            func()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    sorted_times = sorted(times)
+    return {
+        'median': _percentile(sorted_times, 0.5),
+        'iqr': _percentile(sorted_times, 0.75) -
+            _percentile(sorted_times, 0.25),
+        'min': sorted_times[0],
+        'max': sorted_times[-1],
+        'times': times,
+        'peak_memory': peak_memory,
+        'result_count': len(result) if result is not None else None,
+        }
+
+
+def dataset_stats(transactions):
+    '''Returns the size, the number of distinct items and the density (the
+       average fraction of items in a transaction) of a dataset.'''
+    items = set()
+    total = 0
+    for transaction in transactions:
+        items.update(transaction)
+        total += len(transaction)
+    size = len(transactions)
+    density = float(total) / (size * len(items)) if items else 0.0
+    return {'size': size, 'items': len(items), 'density': density}
+
+
+def run_benchmarks(datasets, engines=None, warmup=1, repeats=5, memory=True,
+        verbose=False):
+    '''Benchmarks engines on datasets.
+
+       :param datasets: a dict, {name: (transactions, min_support)}.
+       :param engines: the names of the engines to run (keys of `ENGINES`).
+        Default to all engines.
+       :param warmup: the number of untimed runs.
+       :param repeats: the number of timed runs.
+       :param memory: measure the peak memory.
+       :param verbose: print each result as it is computed.
+       :rtype: A JSON-serializable dict, {'meta': {...}, 'results': [...]}.
+    '''
+    if engines is None:
+        engines = list(ENGINES)
+    results = []
+    for name in datasets:
+        (transactions, support) = datasets[name]
+        stats = dataset_stats(transactions)
+        for engine in engines:
+            func = ENGINES[engine]
+            result = measure(lambda: func(transactions, support), warmup,
+                    repeats, memory)
+            result.update(stats)
+            result.update({'engine': engine, 'dataset': name,
+                'support': support})
+            results.append(result)
+            if verbose:
+                print(format_result(result))
+    return {'meta': _meta(warmup, repeats), 'results': results}
+
+
+def _meta(warmup, repeats):
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'warmup': warmup,
+        'repeats': repeats,
+        }
+
+
+def format_result(result):
+    memory = result['peak_memory']
+    memory = '{0:.1f} MiB'.format(memory / 1048576.0) if memory is not None \
+        else 'n/a'
+    return '{0:<17} {1:<20} median {2:.4f}s  IQR {3:.4f}s  peak {4}  ' \
+        '({5} results)'.format(result['engine'], result['dataset'],
+            result['median'], result['iqr'], memory, result['result_count'])
+
+
+def get_default_datasets(seed=0):
+    '''Returns the sparse and dense random datasets of
+       `perftesting.test_itemset_perf`.'''
+    random.seed(seed)
+    sparse = perftesting.get_random_transactions(transaction_number=500,
+            universe_size=2000, key_alphabet=None)
+    dense = perftesting.get_random_transactions(transaction_number=75,
+            universe_size=110, key_alphabet=None)
+    return OrderedDict([
+        ('sparse', (_as_sequences(sparse), 10)),
+        ('dense', (_as_sequences(dense), 25)),
+        ])
+
+
+def _as_sequences(transactions):
+    # Tuples can be used by both the item set and the sequence miners.
+    return [tuple(sorted(transaction)) for transaction in transactions]
+
+
+def sweep(sizes=(250, 500, 1000), universe_sizes=(2000, 500, 110),
+        support_ratio=0.02, engines=None, seed=0, **kwargs):
+    '''Benchmarks engines on random datasets of increasing size and density
+       to produce scaling curves.
+
+       :param sizes: the numbers of transactions.
+       :param universe_sizes: the numbers of distinct items. A transaction
+        has up to a quarter of the universe (at most 100 items), so the
+        smaller the universe, the denser the dataset.
+       :param support_ratio: the minimal support, as a fraction of the
+        number of transactions.
+       :param engines: the names of the engines to run. Default to the item
+        set engines.
+       :param seed: the seed of the random datasets.
+       :param kwargs: passed to `run_benchmarks`.
+       :rtype: the same as `run_benchmarks`.
+    '''
+    if engines is None:
+        engines = ['relim', 'sam', 'fpgrowth_pruning', 'fpgrowth']
+    datasets = OrderedDict()
+    for universe_size in universe_sizes:
+        for size in sizes:
+            random.seed(seed)
+            transactions = perftesting.get_random_transactions(
+                    transaction_number=size, universe_size=universe_size,
+                    max_item_per_transaction=min(100, universe_size // 4),
+                    key_alphabet=None)
+            name = 'n{0}_u{1}'.format(size, universe_size)
+            support = max(2, int(size * support_ratio))
+            datasets[name] = (_as_sequences(transactions), support)
+    return run_benchmarks(datasets, engines, **kwargs)
+
+
+def save_results(results, path):
+    '''Writes benchmark results as JSON.'''
+    with open(path, 'w') as output:
+        json.dump(results, output, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    '''Reads benchmark results written by `save_results`.'''
+    with open(path) as input_file:
+        return json.load(input_file)
+
+
+def compare(results, baseline, tolerance=0.1):
+    '''Compares results with a baseline.
+
+       A result is a regression if its median time (or its peak memory) is
+       more than `tolerance` above the baseline, and if the difference in
+       time is larger than the IQR of both runs.
+
+       :param results: the output of `run_benchmarks`.
+       :param baseline: an older output of `run_benchmarks`.
+       :param tolerance: the relative slowdown that is tolerated.
+       :rtype: A list of (engine, dataset, metric, baseline_value, value).
+    '''
+    old_results = {(r['engine'], r['dataset']): r for r in
+            baseline['results']}
+    regressions = []
+    for result in results['results']:
+        old = old_results.get((result['engine'], result['dataset']))
+        if old is None:
+            continue
+        noise = max(result['iqr'], old['iqr'])
+        if result['median'] > old['median'] * (1 + tolerance) and \
+                result['median'] - old['median'] > noise:
+            regressions.append((result['engine'], result['dataset'],
+                'median', old['median'], result['median']))
+        if result['peak_memory'] is not None and \
+                old['peak_memory'] is not None and \
+                result['peak_memory'] > old['peak_memory'] * (1 + tolerance):
+            regressions.append((result['engine'], result['dataset'],
+                'peak_memory', old['peak_memory'], result['peak_memory']))
+    return regressions
+
+
+def main(args=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmarks the pymining '
+            'algorithms.')
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES),
+            help='engines to run (default: all)')
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--no-memory', action='store_true',
+            help='do not measure the peak memory')
+    parser.add_argument('--sweep', action='store_true',
+            help='run the size and density sweep instead of the default '
+            'datasets')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results to this JSON '
+            'file')
+    parser.add_argument('--baseline', help='compare with the results in '
+            'this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    options = parser.parse_args(args)
+
+    kwargs = {'warmup': options.warmup, 'repeats': options.repeats,
+            'memory': not options.no_memory, 'verbose': True}
+    if options.sweep:
+        results = sweep(engines=options.engines, seed=options.seed, **kwargs)
+    else:
+        results = run_benchmarks(get_default_datasets(options.seed),
+                options.engines, **kwargs)
+
+    if options.output:
+        save_results(results, options.output)
+
+    if options.baseline:
+        regressions = compare(results, load_results(options.baseline),
+                options.tolerance)
+        for (engine, dataset, metric, old, new) in regressions:
+            print('REGRESSION {0} on {1}: {2} {3:.4g} -> {4:.4g}'.format(
+                engine, dataset, metric, old, new))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
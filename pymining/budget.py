@@ -0,0 +1,123 @@
+'''Time and size budgets for long mining runs.
+
+A `Budget` is passed to a miner (e.g., `itemmining.relim(rinput, 2,
+budget=Budget(timeout=60))`). The miner checks it as it finds patterns and
+stops as soon as the budget is exhausted. It then returns the patterns found
+so far in a report flagged as incomplete.
+'''
+from time import time
+
+
+DEADLINE = 'deadline'
+MAX_RESULTS = 'max_results'
+CANCELLED = 'cancelled'
+
+
+class BudgetExceeded(Exception):
+    '''Raised inside a miner to unwind the search when its budget is
+       exhausted. Miners catch it and return a partial report.'''
+
+    def __init__(self, reason):
+        super(BudgetExceeded, self).__init__(reason)
+        self.reason = reason
+
+
+class Budget(object):
+    '''Limits a mining run.
+
+       The number of results is checked for every pattern found. The clock
+       and the cancel token are only checked every `check_interval` patterns.
+
+       :ivar reason: why the last run was stopped (`DEADLINE`,
+        `MAX_RESULTS` or `CANCELLED`), or None if it was not.
+    '''
+
+    def __init__(self, deadline=None, timeout=None, max_results=None,
+            cancel=None, check_interval=256):
+        '''
+           :param deadline: the time (as returned by `time.time()`) at which
+            the run must stop.
+           :param timeout: the number of seconds the run may last, from the
+            moment it starts.
+           :param max_results: the maximal number of patterns to find.
+           :param cancel: an object with an `is_set()` method, e.g., a
+            `threading.Event`. The run stops when it is set.
+           :param check_interval: the number of patterns found between two
+            checks of the clock and of the cancel token.
+        '''
+        self.deadline = deadline
+        self.timeout = timeout
+        self.max_results = max_results
+        self.cancel = cancel
+        self.check_interval = check_interval
+        self.reason = None
+        self._deadline = None
+        self._count = 0
+
+    def start(self):
+        '''Called by the miners when a run starts.'''
+        self.reason = None
+        self._count = 0
+        self._deadline = self.deadline
+        if self.timeout is not None:
+            timeout_deadline = time() + self.timeout
+            if self._deadline is None or timeout_deadline < self._deadline:
+                self._deadline = timeout_deadline
+        self._check_clock()
+
+    def check(self, result_count, force=False):
+        '''Called by the miners each time a pattern is found. Raises
+           `BudgetExceeded` if the run must stop.
+
+           :param result_count: the number of patterns found so far.
+           :param force: check the clock and the cancel token now.
+        '''
+        if self.max_results is not None and result_count >= self.max_results:
+            self._stop(MAX_RESULTS)
+        self._count += 1
+        if force or self._count >= self.check_interval:
+            self._count = 0
+            self._check_clock()
+
+    def _check_clock(self):
+        if self.cancel is not None and self.cancel.is_set():
+            self._stop(CANCELLED)
+        if self._deadline is not None and time() >= self._deadline:
+            self._stop(DEADLINE)
+
+    def _stop(self, reason):
+        self.reason = reason
+        raise BudgetExceeded(reason)
+
+
+class ItemsetReport(dict):
+    '''The report of an item set miner run with a budget: {itemset:
+       support}.
+
+       :ivar complete: False if the run was stopped by its budget.
+       :ivar reason: why the run was stopped, or None.
+    '''
+    complete = True
+    reason = None
+
+
+class SequenceReport(set):
+    '''The set of (sequence, support) of a sequence miner run with a budget.
+
+       :ivar complete: False if the run was stopped by its budget.
+       :ivar reason: why the run was stopped, or None.
+    '''
+    complete = True
+    reason = None
+
+
+def run(budget, mine, report):
+    '''Calls `mine()`, which fills `report`, within `budget`. Returns the
+       report, flagged as incomplete if the budget was exhausted.'''
+    try:
+        budget.start()
+        mine()
+    except BudgetExceeded as e:
+        report.complete = False
+        report.reason = e.reason
+    return report
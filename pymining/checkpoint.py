@@ -0,0 +1,159 @@
+'''Checkpoints of long mining runs.
+
+The miners can log their progress after each top-level item (e.g.,
+`itemmining.relim(rinput, 2, checkpoint='run.ckpt')`). A run started again
+with the same input and parameters reads the log, skips the items that were
+completed and returns the same report as a run that was not interrupted.
+
+The log is a file of pickled records, appended and flushed to disk after
+each item: a header with the fingerprint of the run, then (number of
+completed items, new item sets) records. A record cut short by a crash is
+ignored and overwritten.
+'''
+import hashlib
+import os
+import pickle
+from time import time
+
+
+_MAGIC = 'pymining-checkpoint'
+_VERSION = 1
+
+
+class CheckpointMismatch(ValueError):
+    '''Raised when a checkpoint was written by a run with another input or
+       other parameters, or when the file is not a checkpoint.'''
+
+
+def fingerprint(parameters, records):
+    '''Returns a digest of the parameters and of the input of a run.
+
+       :param parameters: a picklable tuple, e.g., (miner, min_support).
+       :param records: an iterable of the picklable parts of the input.
+    '''
+    digest = hashlib.sha1(pickle.dumps(parameters, 2))
+    for record in records:
+        digest.update(pickle.dumps(record, 2))
+    return digest.hexdigest()
+
+
+class Checkpoint(object):
+    '''The log of a run.
+
+       :ivar done: the number of top-level items completed.
+    '''
+
+    def __init__(self, path, interval=0):
+        '''
+           :param path: the file of the log.
+           :param interval: the minimal number of seconds between two
+            writes. The items completed in between are written with the
+            next one. Default to 0 (after each item).
+        '''
+        self.path = path
+        self.interval = interval
+        self.done = 0
+        self._file = None
+        # The (itemset, support) found since the last write, and how many
+        # of them belong to completed items.
+        self._new = []
+        self._pending = None
+        self._last = 0
+
+    def open(self, fingerprint, report):
+        '''Reads the log, if any, and adds the item sets found so far to
+           report. Returns the number of completed items.
+
+           :raises CheckpointMismatch: the file is not the log of this run.
+        '''
+        self.done = 0
+        self._new = []
+        self._pending = None
+        header = pickle.dumps((_MAGIC, _VERSION, fingerprint),
+                pickle.HIGHEST_PROTOCOL)
+        offset = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as input_file:
+                offset = self._read(input_file, header, report)
+        self._file = open(self.path, 'r+b' if offset else 'wb')
+        self._file.seek(offset)
+        self._file.truncate()
+        if not offset:
+            self._file.write(header)
+            self._sync()
+        self._last = time()
+        return self.done
+
+    def logged(self, report):
+        '''Returns the report to give to the miner: it adds the item sets
+           to report and keeps them for the next write.'''
+        return _LoggedReport(report, self._new)
+
+    def _read(self, input_file, header, report):
+        # Returns the offset of the end of the last complete record, or 0
+        # if the file is empty or its header was cut short.
+        data = input_file.read(len(header))
+        if data != header:
+            if header.startswith(data):
+                return 0
+            # Never overwrite a file that is not a log of this run.
+            raise CheckpointMismatch('{0} is not a checkpoint of this '
+                    'run'.format(self.path))
+        offset = input_file.tell()
+        while True:
+            try:
+                (done, itemsets) = pickle.load(input_file)
+            except Exception:
+                return offset
+            for (itemset, support) in itemsets:
+                report[itemset] = support
+            self.done = done
+            offset = input_file.tell()
+
+    def _write(self, record):
+        pickle.dump(record, self._file, pickle.HIGHEST_PROTOCOL)
+        self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def save(self, done):
+        '''Logs that `done` top-level items are completed. The item sets
+           are those added to the logged report since the last save.'''
+        self.done = done
+        self._pending = len(self._new)
+        if time() - self._last >= self.interval:
+            self._flush()
+
+    def _flush(self):
+        if self._pending is None:
+            return
+        self._write((self.done, self._new[:self._pending]))
+        # The item sets of the item being mined are kept.
+        del self._new[:self._pending]
+        self._pending = None
+        self._last = time()
+
+    def close(self):
+        '''Writes the completed items that were not written yet.'''
+        if self._file is not None:
+            self._flush()
+            self._file.close()
+            self._file = None
+
+
+class _LoggedReport(object):
+    # The report seen by a checkpointed miner, which only sets item sets
+    # and counts them.
+
+    def __init__(self, report, new):
+        self._report = report
+        self._new = new
+
+    def __setitem__(self, itemset, support):
+        self._report[itemset] = support
+        self._new.append((itemset, support))
+
+    def __len__(self):
+        return len(self._report)
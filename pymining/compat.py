@@ -1,6 +1,5 @@
-import sys
-
-if sys.version_info[0] < 3:
-    range = xrange
-else:
-    range = range
+try:
+    import numpy
+except ImportError:
+    # Optional: only needed by the vectorized algorithms.
+    numpy = None
@@ -0,0 +1,158 @@
+'''Exact support of given item sets, e.g., to check last week's rules on this
+week's transactions without mining them::
+
+    >>> supports = counting.count_supports(candidates, transactions)
+    >>> supports[frozenset(['a', 'b'])]
+    42
+
+The transactions are read once into vertical bitmaps: for each item, an
+integer whose bit i is set if the i-th distinct transaction contains the
+item. The support of an item set is the (weighted) number of bits of the
+intersection of its bitmaps. Candidates are sorted so that the
+intersections of common prefixes are computed once.
+'''
+from collections import defaultdict
+from operator import itemgetter
+
+from pymining import itemmining
+
+
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+else:
+    def _popcount(bitmap):
+        return bin(bitmap).count('1')
+
+
+def _bitmap(tids, size):
+    # Builds the integer whose bits tids are set.
+    bits = bytearray((size + 7) // 8)
+    for tid in tids:
+        bits[tid >> 3] |= 1 << (tid & 7)
+    return int.from_bytes(bytes(bits), 'little')
+
+
+class VerticalIndex(object):
+    '''The bitmaps of the items of transactions. It can count the support of
+       several batches of candidates.
+
+       :ivar size: the number of transactions.
+    '''
+
+    def __init__(self, transactions, key_func=None, weighted=False,
+            items=None):
+        '''
+           :param transactions: a sequence of sequences. [ [transaction
+            items...]] or a matrix (see `pymining.arrays`).
+           :param key_func: a function that returns a comparable key for a
+            transaction item.
+           :param weighted: if True, transactions is a sequence of (count,
+            transaction) and each transaction is counted `count` times.
+           :param items: if given, only index these keys. Transactions that
+            are equal on these keys are then stored once.
+        '''
+        (baskets, frequencies, _) = itemmining._ingest(transactions,
+                key_func, weighted)
+        self.size = sum(baskets.values())
+        if items is not None:
+            items = frozenset(items)
+            projected = defaultdict(int)
+            for (basket, count) in baskets.items():
+                basket = items.intersection(basket)
+                if basket:
+                    projected[basket] += count
+            baskets = projected
+        else:
+            baskets = {basket: count for (basket, count) in baskets.items()
+                    if basket}
+
+        tids = defaultdict(list)
+        counts = []
+        for (tid, (basket, count)) in enumerate(baskets.items()):
+            counts.append(count)
+            for item in basket:
+                tids[item].append(tid)
+        size = len(counts)
+
+        # The rarest items first, so that intersections shrink fast.
+        ranked = sorted(tids, key=lambda item: frequencies[item])
+        self._rank = {item: code for (code, item) in enumerate(ranked)}
+        self._bitmaps = [_bitmap(tids.pop(item), size) for item in ranked]
+        self._all = (1 << size) - 1
+        # Bit j of the count of a transaction is set in the j-th plane.
+        self._planes = []
+        for plane in range(max(counts or [0]).bit_length()):
+            self._planes.append(_bitmap([tid for (tid, count) in
+                enumerate(counts) if count >> plane & 1], size))
+
+    def _weight(self, bitmap):
+        return sum(_popcount(bitmap & plane) << j for (j, plane) in
+                enumerate(self._planes))
+
+    def support(self, itemset):
+        '''Returns the number of transactions containing all the keys of
+           itemset.'''
+        if not itemset:
+            return self.size
+        bitmap = self._all
+        for item in itemset:
+            code = self._rank.get(item)
+            if code is None:
+                return 0
+            bitmap &= self._bitmaps[code]
+        return self._weight(bitmap)
+
+    def supports(self, candidates):
+        '''Counts the support of each candidate.
+
+           :param candidates: an iterable of collections of keys.
+           :rtype: a dict, {frozenset of keys: support}.
+        '''
+        encoded = []
+        result = {}
+        for candidate in candidates:
+            candidate = frozenset(candidate)
+            if not candidate:
+                result[candidate] = self.size
+                continue
+            codes = [self._rank.get(item) for item in candidate]
+            if None in codes:
+                result[candidate] = 0
+            else:
+                encoded.append((sorted(codes), candidate))
+        encoded.sort(key=itemgetter(0))
+
+        # stack[i] is the intersection of the first i items of previous.
+        stack = [self._all]
+        previous = []
+        bitmaps = self._bitmaps
+        for (codes, candidate) in encoded:
+            common = 0
+            limit = min(len(codes), len(previous))
+            while common < limit and codes[common] == previous[common]:
+                common += 1
+            del stack[common + 1:]
+            for code in codes[common:]:
+                stack.append(stack[-1] & bitmaps[code])
+            result[candidate] = self._weight(stack[-1])
+            previous = codes
+        return result
+
+
+def count_supports(candidates, transactions, key_func=None, weighted=False):
+    '''Counts the support of candidate item sets in one pass over the
+       transactions. Only the items of the candidates are indexed.
+
+       :param candidates: an iterable of collections of keys.
+       :param transactions: a sequence of sequences. [ [transaction
+        items...]] or a matrix (see `pymining.arrays`).
+       :param key_func: a function that returns a comparable key for a
+        transaction item.
+       :param weighted: if True, transactions is a sequence of (count,
+        transaction) and each transaction is counted `count` times.
+       :rtype: a dict, {frozenset of keys: support}.
+    '''
+    candidates = [frozenset(candidate) for candidate in candidates]
+    items = frozenset().union(*candidates)
+    index = VerticalIndex(transactions, key_func, weighted, items)
+    return index.supports(candidates)
@@ -0,0 +1,121 @@
+'''Transactions from long format event logs, i.e., one (user, item) row per
+event instead of one row per transaction.
+
+The rows are grouped on the fly, so only one transaction is held in memory
+at a time. An `EventLog` can be iterated several times and passed to the
+miners' preprocessing directly::
+
+    >>> log = eventlog.EventLog(['plays-0.csv', 'plays-1.csv'])
+    >>> report = itemmining.relim(itemmining.get_relim_input(log), 100)
+'''
+import csv
+from itertools import chain, groupby
+from operator import itemgetter
+
+
+def group_events(rows, key=itemgetter(0), value=itemgetter(1),
+        with_keys=False):
+    '''Groups consecutive rows with the same key into transactions.
+
+       :param rows: an iterable of rows, sorted (or at least grouped) by key.
+       :param key: a function that returns the transaction key (e.g., the
+        user) of a row.
+       :param value: a function that returns the item of a row.
+       :param with_keys: yield (key, transaction) instead of transactions.
+       :rtype: a generator of lists of items.
+    '''
+    for (group_key, group) in groupby(rows, key):
+        transaction = [value(row) for row in group]
+        if with_keys:
+            yield (group_key, transaction)
+        else:
+            yield transaction
+
+
+def group_partition(rows, key=itemgetter(0), value=itemgetter(1),
+        with_keys=False):
+    '''Groups the rows of a partition that holds all the rows of its keys in
+       any order. The whole partition is held in memory.
+
+       :rtype: a generator of lists of items, in the order in which the
+        keys first appear.
+    '''
+    transactions = {}
+    order = []
+    for row in rows:
+        row_key = key(row)
+        try:
+            transactions[row_key].append(value(row))
+        except KeyError:
+            transactions[row_key] = [value(row)]
+            order.append(row_key)
+    for row_key in order:
+        if with_keys:
+            yield (row_key, transactions.pop(row_key))
+        else:
+            yield transactions.pop(row_key)
+
+
+def read_rows(path, delimiter=',', skip_header=False):
+    '''Yields the rows (lists of strings) of a delimited text file.'''
+    with open(path) as input_file:
+        reader = csv.reader(input_file, delimiter=delimiter)
+        if skip_header:
+            next(reader, None)
+        for row in reader:
+            if row:
+                yield row
+
+
+class EventLog(object):
+    '''The transactions of one or more event log files: either consecutive
+       pieces of a log sorted by key, or partitions that hold all the rows
+       of their keys.
+
+       Iterating an EventLog reads the files again, so it can be used by
+       algorithms that make several passes.
+    '''
+
+    def __init__(self, paths, key_column=0, item_column=1, delimiter=',',
+            skip_header=False, is_sorted=True, with_keys=False):
+        '''
+           :param paths: a path or a list of paths.
+           :param key_column: the index of the column of the transaction
+            key (e.g., the user).
+           :param item_column: the index of the column of the item.
+           :param delimiter: the column separator.
+           :param skip_header: ignore the first line of each file.
+           :param is_sorted: True if the rows are grouped by key across the
+            files. Memory is then bounded by the largest transaction. If
+            False, each file is grouped in memory.
+           :param with_keys: yield (key, transaction) instead of
+            transactions.
+        '''
+        if isinstance(paths, str):
+            paths = [paths]
+        self.paths = list(paths)
+        self.key_column = key_column
+        self.item_column = item_column
+        self.delimiter = delimiter
+        self.skip_header = skip_header
+        self.is_sorted = is_sorted
+        self.with_keys = with_keys
+
+    def _rows(self, path):
+        return read_rows(path, self.delimiter, self.skip_header)
+
+    def __iter__(self):
+        key = itemgetter(self.key_column)
+        value = itemgetter(self.item_column)
+        if self.is_sorted:
+            # A key may continue in the next file.
+            rows = chain.from_iterable(self._rows(path) for path in
+                    self.paths)
+            for transaction in group_events(rows, key, value,
+                    self.with_keys):
+                yield transaction
+        else:
+            for path in self.paths:
+                for transaction in group_partition(self._rows(path), key,
+                        value, self.with_keys):
+                    yield transaction
@@ -1,86 +1,311 @@
+from bisect import bisect_right
 from collections import defaultdict, deque, OrderedDict
+import hashlib
+from itertools import islice
+import logging
+from operator import itemgetter
+from timeit import default_timer
+from pymining import arrays as _arrays
+from pymining import budget as _budget
+from pymining import checkpoint as _checkpoint
+from pymining import spill as _spill
+
+
+logger = logging.getLogger(__name__)
+
+
+class MiningStats(object):
+    '''Statistics about the search of an item set mining algorithm. Pass an
+       instance as the `stats` parameter of `relim`, `sam` or `fpgrowth`.
+       Collecting statistics has no cost when `stats` is None.
+
+       :ivar nodes_per_depth: {depth: number of frequent item sets expanded}.
+        Depth 0 is the first item of an item set.
+       :ivar cond_db_sizes: {depth: total size of the conditional databases
+        built}. The size is the number of transaction rests (relim and sam)
+        or of prefix paths (fpgrowth).
+       :ivar max_cond_db_size: the size of the largest conditional database.
+       :ivar items_pruned: the number of candidate items discarded because
+        their support was too low.
+       :ivar top_level_times: {item: seconds spent mining the item sets
+        whose least frequent item is item}, in the order of the search.
+       :ivar peak_results: the largest number of item sets in the report.
+    '''
+
+    def __init__(self, callback=None):
+        '''
+           :param callback: a function called after each top level item with
+            (item, seconds, stats).
+        '''
+        self.callback = callback
+        self.nodes_per_depth = defaultdict(int)
+        self.cond_db_sizes = defaultdict(int)
+        self.max_cond_db_size = 0
+        self.items_pruned = 0
+        self.top_level_times = OrderedDict()
+        self.peak_results = 0
+        self._top_depth = 0
+
+    def _expand(self, depth, cond_db_size):
+        self.nodes_per_depth[depth] += 1
+        self.cond_db_sizes[depth] += cond_db_size
+        if cond_db_size > self.max_cond_db_size:
+            self.max_cond_db_size = cond_db_size
+
+    def _top_level_done(self, item, seconds, report):
+        self.top_level_times[item] = seconds
+        self.peak_results = max(self.peak_results, len(report))
+        if self.callback is not None:
+            self.callback(item, seconds, self)
+
+    def hot_items(self, n=10):
+        '''Returns the `n` top level items that took the most time, as a
+           list of (item, seconds).'''
+        return sorted(self.top_level_times.items(), key=lambda e: e[1],
+                reverse=True)[:n]
+
+    def __str__(self):
+        return 'nodes: {0}, max conditional database: {1}, pruned: {2}, ' \
+            'results: {3}'.format(dict(self.nodes_per_depth),
+                    self.max_cond_db_size, self.items_pruned,
+                    self.peak_results)
+
+
+class IngestionStats(object):
+    '''Statistics about the preprocessing of transactions. Pass an instance
+       as the `ingestion_stats` parameter of `get_relim_input`,
+       `get_sam_input` or `get_fptree`.
+
+       :ivar records: the number of records read (a weighted record counts
+        once).
+       :ivar transactions: the number of transactions read (a weighted record
+        counts `count` times).
+       :ivar unique: the number of distinct transactions.
+       :ivar items: the number of distinct items kept.
+       :ivar seconds: the preprocessing time.
+    '''
 
+    def __init__(self):
+        self.records = 0
+        self.transactions = 0
+        self.unique = 0
+        self.items = 0
+        self.seconds = 0.0
+
+    @property
+    def baskets_per_second(self):
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def _done(self, records, baskets, items, seconds):
+        self.records += records
+        self.transactions += sum(baskets.values())
+        self.unique += len(baskets)
+        self.items = items
+        self.seconds += seconds
+        logger.debug('Ingested %s', self)
 
-def _sort_transactions_by_freq(transactions, key_func, reverse_int=False,
-        reverse_ext=False, sort_ext=True):
-    key_seqs = [{key_func(i) for i in sequence} for sequence in transactions]
-    frequencies = get_frequencies(key_seqs)
+    def __str__(self):
+        return '{0} records ({1} transactions, {2} unique, {3} items) in ' \
+            '{4:.3f}s, {5:.0f} baskets/s'.format(self.records,
+                    self.transactions, self.unique, self.items, self.seconds,
+                    self.baskets_per_second)
+
+
+def _ingest(transactions, key_func=None, weighted=False, exclude=None):
+    # Applies key_func once per item and counts each distinct transaction:
+    # returns ({frozenset of keys: count}, {key: frequency}, records). The
+    # keys in exclude are removed.
+    if _arrays.is_matrix(transactions):
+        return _arrays.ingest(transactions, key_func, exclude)
+    baskets = defaultdict(int)
+    records = 0
+    if weighted:
+        for (count, transaction) in transactions:
+            if key_func is not None:
+                transaction = map(key_func, transaction)
+            baskets[frozenset(transaction)] += count
+            records += 1
+    else:
+        for transaction in transactions:
+            if key_func is not None:
+                transaction = map(key_func, transaction)
+            baskets[frozenset(transaction)] += 1
+            records += 1
+    if exclude:
+        # Removing keys can make two transactions equal.
+        kept = defaultdict(int)
+        for (basket, count) in baskets.items():
+            kept[basket.difference(exclude)] += count
+        baskets = kept
 
-    asorted_seqs = []
-    for key_seq in key_seqs:
-        if not key_seq:
+    frequencies = defaultdict(int)
+    for (basket, count) in baskets.items():
+        for item in basket:
+            frequencies[item] += count
+    return (baskets, frequencies, records)
+
+
+def _encode(baskets, frequencies, min_support=None, reverse=False):
+    # Returns [(sorted ((frequency, key),...), count)] without empty or
+    # duplicate transactions. Items below min_support are removed. Baskets
+    # stored as arrays (see arrays and shm) encode themselves.
+    if hasattr(baskets, 'encode'):
+        return baskets.encode(min_support, reverse)
+    if not min_support:
+        encoded = []
+        for (basket, count) in baskets.items():
+            if not basket:
+                continue
+            # Sort each transaction (infrequent key first)
+            l = [(frequencies[i], i) for i in basket]
+            l.sort(reverse=reverse)
+            encoded.append((tuple(l), count))
+        return encoded
+
+    # Removing items can make two transactions equal.
+    encoded = defaultdict(int)
+    for (basket, count) in baskets.items():
+        l = [(frequencies[i], i) for i in basket if frequencies[i] >=
+                min_support]
+        if not l:
             continue
-        # Sort each transaction (infrequent key first)
-        l = [(frequencies[i], i) for i in key_seq]
-        l.sort(reverse=reverse_int)
-        asorted_seqs.append(tuple(l))
-    # Sort all transactions. Those with infrequent key first, first
-    if sort_ext:
-        asorted_seqs.sort(reverse=reverse_ext)
+        l.sort(reverse=reverse)
+        encoded[tuple(l)] += count
+    return list(encoded.items())
+
+
+def _frequent_count(frequencies, min_support):
+    if not min_support:
+        return len(frequencies)
+    return sum(1 for f in frequencies.values() if f >= min_support)
+
 
-    return (asorted_seqs, frequencies)
+def _new_report(budget):
+    return {} if budget is None else _budget.ItemsetReport()
 
 
-def get_frequencies(transactions):
+def _conditional(transactions, include):
+    # Keeps the (count, keys) transactions containing include, without the
+    # keys of include: returns (support of include, baskets, frequencies).
+    support = 0
+    conditional = []
+    for (count, keys) in transactions:
+        keys = frozenset(keys)
+        if include.issubset(keys):
+            support += count
+            conditional.append((count, keys.difference(include)))
+    (baskets, frequencies, _) = _ingest(conditional, weighted=True)
+    return (support, baskets, frequencies)
+
+
+def _include(transactions, include, min_support, budget, build):
+    # Returns (input of the conditional database or None, fis, report).
+    include = frozenset(include)
+    report = _new_report(budget)
+    (support, baskets, frequencies) = _conditional(transactions, include)
+    if support < min_support:
+        return (None, None, report)
+    report[include] = support
+    return (build(baskets, frequencies, min_support), set(include), report)
+
+
+def get_frequencies(transactions, counts=None):
     '''Computes a dictionary, {key:frequencies} containing the frequency of
        each key in all transactions. Duplicate keys in a transaction are
        counted twice.
 
        :param transactions: a sequence of sequences. [ [transaction items...]]
+       :param counts: the number of times each transaction appears. Default
+        to once.
     '''
     frequencies = defaultdict(int)
-    for transaction in transactions:
-        for item in transaction:
-            frequencies[item] += 1
+    if counts is None:
+        for transaction in transactions:
+            for item in transaction:
+                frequencies[item] += 1
+    else:
+        for (transaction, count) in zip(transactions, counts):
+            for item in transaction:
+                frequencies[item] += count
     return frequencies
 
 
-def get_sam_input(transactions, key_func=None):
+def get_sam_input(transactions, key_func=None, weighted=False,
+        min_support=None, ingestion_stats=None, exclude=None):
     '''Given a list of transactions and a key function, returns a data
        structure used as the input of the sam algorithm.
 
        :param transactions: a sequence of sequences. [ [transaction items...]]
+        or a matrix (see `pymining.arrays`).
        :param key_func: a function that returns a comparable key for a
         transaction item.
+       :param weighted: if True, transactions is a sequence of (count,
+        transaction) and each transaction is counted `count` times.
+       :param min_support: if given, remove the items that are less
+        frequent. They cannot be part of a frequent item set.
+       :param ingestion_stats: An `IngestionStats` collecting statistics
+        about the preprocessing. Default to None.
+       :param exclude: a collection of keys to ignore.
     '''
+    start = default_timer()
+    (baskets, frequencies, records) = _ingest(transactions, key_func,
+            weighted, exclude)
+    sam_input = _build_sam_input(baskets, frequencies, min_support)
+    if ingestion_stats is not None:
+        ingestion_stats._done(records, baskets,
+                _frequent_count(frequencies, min_support),
+                default_timer() - start)
+    return sam_input
 
-    if key_func is None:
-        key_func = lambda e: e
-
-    (asorted_seqs, _) = _sort_transactions_by_freq(transactions, key_func)
 
-    # Group same transactions together
-    sam_input = deque()
-    visited = {}
-    current = 0
-    for seq in asorted_seqs:
-        if seq not in visited:
-            sam_input.append((1, seq))
-            visited[seq] = current
-            current += 1
-        else:
-            i = visited[seq]
-            (count, oldseq) = sam_input[i]
-            sam_input[i] = (count + 1, oldseq)
-    return sam_input
+def _build_sam_input(baskets, frequencies, min_support=None):
+    asorted_seqs = _encode(baskets, frequencies, min_support)
+    # Sort all transactions. Those with infrequent key first, first
+    asorted_seqs.sort(key=itemgetter(0))
+    return deque((count, seq) for (seq, count) in asorted_seqs)
 
 
-def sam(sam_input, min_support=2):
+def sam(sam_input, min_support=2, stats=None, budget=None, include=None):
     '''Finds frequent item sets of items appearing in a list of transactions
        based on the Split and Merge algorithm by Christian Borgelt.
 
        :param sam_input: The input of the algorithm. Must come from
         `get_sam_input`.
        :param min_support: The minimal support of a set to be included.
+       :param stats: A `MiningStats` collecting statistics about the search.
+        Default to None.
+       :param budget: A `budget.Budget` limiting the search. If given, the
+        result is a `budget.ItemsetReport`, flagged as incomplete if the
+        search was stopped. Default to None.
+       :param include: only find the item sets containing all these keys.
+        Only the transactions containing them are mined. The depths of
+        `stats` then start at the number of included keys.
        :rtype: A set containing the frequent item sets and their support.
     '''
-    fis = set()
-    report = {}
-    _sam(sam_input, fis, report, min_support)
+    if include:
+        (sam_input, fis, report) = _include(_sam_transactions(sam_input),
+                include, min_support, budget, _build_sam_input)
+        if sam_input is None:
+            return report
+    else:
+        fis = set()
+        report = _new_report(budget)
+    if stats is not None:
+        # The top level items follow the included keys.
+        stats._top_depth = len(fis)
+    if budget is not None:
+        return _budget.run(budget, lambda: _sam(sam_input, fis, report,
+            min_support, stats, budget), report)
+    _sam(sam_input, fis, report, min_support, stats)
     return report
 
 
-def _sam(sam_input, fis, report, min_support):
+def _sam_transactions(sam_input):
+    for (count, seq) in sam_input:
+        yield (count, [item[1] for item in seq])
+
+
+def _sam(sam_input, fis, report, min_support, stats=None, budget=None):
     n = 0
     a = deque(sam_input)
     while len(a) > 0 and len(a[0][1]) > 0:
@@ -111,11 +336,21 @@ def _sam(sam_input, fis, report, min_support):
             d.append(b.popleft())
         a = d
         if s >= min_support:
+            if stats is not None:
+                depth = len(fis)
+                stats._expand(depth, len(c))
+                start = default_timer()
             fis.add(i[1])
             report[frozenset(fis)] = s
             #print('{0} with support {1}'.format(fis, s))
-            n = n + 1 + _sam(c, fis, report, min_support)
+            if budget is not None:
+                budget.check(len(report))
+            n = n + 1 + _sam(c, fis, report, min_support, stats, budget)
             fis.remove(i[1])
+            if stats is not None and depth == stats._top_depth:
+                stats._top_level_done(i[1], default_timer() - start, report)
+        elif stats is not None:
+            stats.items_pruned += 1
     return n
 
 
@@ -139,15 +374,36 @@ def _get_key_map(frequencies):
     return key_map
 
 
-def get_relim_input(transactions, key_func=None):
+def get_relim_input(transactions, key_func=None, weighted=False,
+        min_support=None, ingestion_stats=None, exclude=None):
     '''Given a list of transactions and a key function, returns a data
-       structure used as the input of the relim algorithm.
+       structure used as the input of the relim algorithm. It is immutable:
+       it can be mined several times, with different supports, and by
+       several threads at once.
 
        :param transactions: a sequence of sequences. [ [transaction items...]]
+        or a matrix (see `pymining.arrays`).
        :param key_func: a function that returns a comparable key for a
         transaction item.
+       :param weighted: if True, transactions is a sequence of (count,
+        transaction) and each transaction is counted `count` times.
+       :param min_support: if given, remove the items that are less
+        frequent. They cannot be part of a frequent item set.
+       :param ingestion_stats: An `IngestionStats` collecting statistics
+        about the preprocessing. Default to None.
+       :param exclude: a collection of keys to ignore.
     '''
+    start = default_timer()
+    (baskets, frequencies, records) = _ingest(transactions, key_func,
+            weighted, exclude)
+    rinput = _build_relim_input(baskets, frequencies, min_support)
+    if ingestion_stats is not None:
+        ingestion_stats._done(records, baskets, len(rinput[1]),
+                default_timer() - start)
+    return rinput
+
 
+def _build_relim_input(baskets, frequencies, min_support=None):
     # Data Structure
     # relim_input[x][0] = (count, key_freq)
     # relim_input[x][1] = [(count, (key_freq, )]
@@ -159,33 +415,33 @@ def get_relim_input(transactions, key_func=None):
     # relim_input[x][1][x][0] = number of times a rest of transaction appears
     # relim_input[x][1][x][1] = rest of transaction prefixed by key_freq
 
-    if key_func is None:
-        key_func = lambda e: e
-
-    (asorted_seqs, frequencies) = _sort_transactions_by_freq(transactions,
-            key_func)
-    key_map = _get_key_map(frequencies)
+    if min_support:
+        key_map = _get_key_map({k: f for (k, f) in frequencies.items() if f >=
+            min_support})
+    else:
+        key_map = _get_key_map(frequencies)
 
     relim_input = _new_relim_input(len(key_map), key_map)
-    for seq in asorted_seqs:
-        if not seq:
-            continue
+    # Encoded transactions are distinct, so are their rests.
+    for (seq, seq_count) in _encode(baskets, frequencies, min_support):
         index = key_map[seq[0]]
         ((count, char), lists) = relim_input[index]
-        rest = seq[1:]
-        found = False
-        for i, (rest_count, rest_seq) in enumerate(lists):
-            if rest_seq == rest:
-                lists[i] = (rest_count + 1, rest_seq)
-                found = True
-                break
-        if not found:
-            lists.append((1, rest))
-        relim_input[index] = ((count + 1, char), lists)
-    return (relim_input, key_map)
+        lists.append((seq_count, seq[1:]))
+        relim_input[index] = ((count + seq_count, char), lists)
+    # Immutable, so that it can be mined several times, concurrently.
+    return (tuple((head, tuple(lists)) for (head, lists) in relim_input),
+            key_map)
 
 
-def relim(rinput, min_support=2):
+def _relim_scratch(rinput):
+    # _relim consumes its input: it gets a copy of the top-level lists. The
+    # rests are tuples and are shared.
+    (relim_input, key_map) = rinput
+    return ([(head, list(lists)) for (head, lists) in relim_input], key_map)
+
+
+def relim(rinput, min_support=2, stats=None, budget=None, include=None,
+        max_length=None, memory_limit=None, checkpoint=None):
     '''Finds frequent item sets of items appearing in a list of transactions
        based on Recursive Elimination algorithm by Christian Borgelt.
 
@@ -196,59 +452,194 @@ def relim(rinput, min_support=2):
        :param rinput: The input of the algorithm. Must come from
         `get_relim_input`.
        :param min_support: The minimal support of a set to be included.
+       :param stats: A `MiningStats` collecting statistics about the search.
+        Default to None.
+       :param budget: A `budget.Budget` limiting the search. If given, the
+        result is a `budget.ItemsetReport`, flagged as incomplete if the
+        search was stopped. Default to None.
+       :param max_length: the maximal size of the item sets to find.
+        Default to None (no limit).
+       :param include: only find the item sets containing all these keys.
+        Only the transactions containing them are mined. The depths of
+        `stats` then start at the number of included keys.
+       :param memory_limit: the estimated size, in bytes, that the
+        conditional databases may take. The databases that do not fit are
+        written to temporary files and mined at the end (see
+        `pymining.spill`). Default to None (no limit).
+       :param checkpoint: a `checkpoint.Checkpoint`, or the path of its
+        file. The progress is logged after each top-level item and, if the
+        file exists, the run it logs is resumed. Cannot be combined with
+        memory_limit. Default to None.
        :rtype: A set containing the frequent item sets and their support.
     '''
-    fis = set()
-    report = {}
-    _relim(rinput, fis, report, min_support)
+    if checkpoint is not None and memory_limit is not None:
+        raise ValueError('checkpoint and memory_limit cannot be combined')
+    if include:
+        (rinput, fis, report) = _include(_relim_transactions(rinput),
+                include, min_support, budget, _build_relim_input)
+        if rinput is None:
+            return report
+    else:
+        fis = set()
+        report = _new_report(budget)
+    if stats is not None:
+        # The top level items follow the included keys.
+        stats._top_depth = len(fis)
+    if checkpoint is not None:
+        fingerprint = _checkpoint.fingerprint(('relim', min_support,
+            max_length, sorted(include or ())), rinput[0])
+        rinput = _relim_scratch(rinput)
+        return _checkpointed(checkpoint, fingerprint, report, budget,
+                lambda checkpoint, logged: _relim(rinput, fis, logged,
+                    min_support, stats, budget, max_length, None,
+                    checkpoint))
+    rinput = _relim_scratch(rinput)
+    if memory_limit is not None:
+        spill = _spill.SpillQueue(memory_limit)
+        try:
+            if budget is not None:
+                return _budget.run(budget, lambda: _relim_spilled(rinput,
+                    fis, report, min_support, stats, budget, max_length,
+                    spill), report)
+            _relim_spilled(rinput, fis, report, min_support, stats, None,
+                    max_length, spill)
+            return report
+        finally:
+            spill.close()
+    if budget is not None:
+        return _budget.run(budget, lambda: _relim(rinput, fis, report,
+            min_support, stats, budget, max_length), report)
+    _relim(rinput, fis, report, min_support, stats, None, max_length)
     return report
 
 
-def _relim(rinput, fis, report, min_support):
+def _relim_transactions(rinput):
+    (relim_input, _) = rinput
+    for ((_, prefix), lists) in relim_input:
+        for (count, rest) in lists:
+            yield (count, [prefix[1]] + [item[1] for item in rest])
+
+
+def _relim(rinput, fis, report, min_support, stats=None, budget=None,
+        max_length=None, spill=None, checkpoint=None):
     (relim_input, key_map) = rinput
     n = 0
     # Maybe this one isn't necessary
     #a = deque(relim_input)
     a = relim_input
+    if checkpoint is not None:
+        # Skip the items completed by a previous run.
+        for _ in range(checkpoint.done):
+            _add_rests(a, a[-1][1], key_map)
+            a.pop()
+        done = checkpoint.done
     while len(a) > 0:
         item = a[-1][0][1]
         s = a[-1][0][0]
         if s >= min_support:
+            if stats is not None:
+                depth = len(fis)
+                stats._expand(depth, len(a[-1][1]))
+                start = default_timer()
             fis.add(item[1])
             #print('Report {0} with support {1}'.format(fis, s))
             report[frozenset(fis)] = s
-            b = _new_relim_input(len(a) - 1, key_map)
-            rest_lists = a[-1][1]
-
-            for (count, rest) in rest_lists:
-                if not rest:
-                    continue
-                k = rest[0]
-                index = key_map[k]
-                new_rest = rest[1:]
-                # Only add this rest if it's not empty!
-                ((k_count, k), lists) = b[index]
-                if len(new_rest) > 0:
-                    lists.append((count, new_rest))
-                b[index] = ((k_count + count, k), lists)
-            n = n + 1 + _relim((b, key_map), fis, report, min_support)
+            if budget is not None:
+                budget.check(len(report))
+            if max_length is None or len(fis) < max_length:
+                rest_lists = a[-1][1]
+                size = 0 if spill is None else _relim_size(rest_lists)
+                if spill is not None and spill.over(size):
+                    # Items are written as indexes, so that they are shared
+                    # again when read.
+                    spill.push((tuple(fis), len(a) - 1), ((count,
+                        tuple(key_map[k] for k in rest)) for (count, rest)
+                        in rest_lists))
+                else:
+                    b = _new_relim_input(len(a) - 1, key_map)
+                    _add_rests(b, rest_lists, key_map)
+                    if spill is not None:
+                        spill.live += size
+                    n = n + _relim((b, key_map), fis, report, min_support,
+                            stats, budget, max_length, spill)
+                    if spill is not None:
+                        spill.live -= size
+            n = n + 1
             fis.remove(item[1])
+            if stats is not None and depth == stats._top_depth:
+                stats._top_level_done(item[1], default_timer() - start,
+                        report)
+        elif stats is not None:
+            stats.items_pruned += 1
 
-        rest_lists = a[-1][1]
-        for (count, rest) in rest_lists:
-            if not rest:
-                continue
-            k = rest[0]
-            index = key_map[k]
-            new_rest = rest[1:]
-            ((k_count, k), lists) = a[index]
-            if len(new_rest) > 0:
-                lists.append((count, new_rest))
-            a[index] = ((k_count + count, k), lists)
+        _add_rests(a, a[-1][1], key_map)
         a.pop()
+        if checkpoint is not None:
+            done += 1
+            checkpoint.save(done)
     return n
 
 
+def _checkpointed(checkpoint, fingerprint, report, budget, mine):
+    # Runs mine(checkpoint, logged report) from the state logged by
+    # checkpoint.
+    if not isinstance(checkpoint, _checkpoint.Checkpoint):
+        checkpoint = _checkpoint.Checkpoint(checkpoint)
+    checkpoint.open(fingerprint, report)
+    logged = checkpoint.logged(report)
+    try:
+        if budget is not None:
+            return _budget.run(budget, lambda: mine(checkpoint, logged),
+                    report)
+        mine(checkpoint, logged)
+        return report
+    finally:
+        checkpoint.close()
+
+
+def _add_rests(a, rest_lists, key_map):
+    # Moves each rest to the list of its first item, without this item.
+    for (count, rest) in rest_lists:
+        if not rest:
+            continue
+        k = rest[0]
+        index = key_map[k]
+        new_rest = rest[1:]
+        # Only add this rest if it's not empty!
+        ((k_count, k), lists) = a[index]
+        if len(new_rest) > 0:
+            lists.append((count, new_rest))
+        a[index] = ((k_count + count, k), lists)
+
+
+# Estimated sizes, in bytes, of a (count, rest) entry, of an item in a rest
+# and of a node of an FP-tree.
+_REST_BYTES = 120
+_ITEM_BYTES = 8
+_NODE_BYTES = 200
+
+
+def _relim_size(rest_lists):
+    # Estimated size of the conditional database built from rest_lists.
+    return sum(_REST_BYTES + _ITEM_BYTES * len(rest) for (_, rest) in
+            rest_lists)
+
+
+def _relim_spilled(rinput, fis, report, min_support, stats, budget,
+        max_length, spill):
+    _relim(rinput, fis, report, min_support, stats, budget, max_length,
+            spill)
+    key_map = rinput[1]
+    items = list(key_map)
+    for ((prefix, size), rest_lists) in spill:
+        b = _new_relim_input(size, key_map)
+        _add_rests(b, ((count, tuple(items[i] for i in rest)) for (count,
+            rest) in rest_lists), key_map)
+        spill.live = sum(_relim_size(lists) for (_, lists) in b)
+        _relim((b, key_map), set(prefix), report, min_support, stats,
+                budget, max_length, spill)
+
+
 class FPNode(object):
 
     root_key = object()
@@ -260,7 +651,7 @@ class FPNode(object):
         self.count = 0
         self.next_node = None
 
-    def add_path(self, path, index, length, heads, last_insert):
+    def add_path(self, path, index, length, heads, last_insert, count=1):
         if index >= length:
             return
 
@@ -271,10 +662,10 @@ class FPNode(object):
             child = self.children[child_key]
         except Exception:
             child = self._create_child(child_key, heads, last_insert)
-        child.count += 1
-        heads[child_key][1] += 1
+        child.count += count
+        heads[child_key][1] += count
 
-        child.add_path(path, index, length, heads, last_insert)
+        child.add_path(path, index, length, heads, last_insert, count)
 
     def _create_child(self, child_key, heads, last_insert):
         child = FPNode(child_key, self)
@@ -374,29 +765,40 @@ class FPNode(object):
         return self.__str__()
 
 
-def get_fptree(transactions, key_func=None, min_support=2):
+def get_fptree(transactions, key_func=None, min_support=2, weighted=False,
+        ingestion_stats=None, exclude=None):
     '''Given a list of transactions and a key function, returns a data
        structure used as the input of the relim algorithm.
 
        :param transactions: a sequence of sequences. [ [transaction items...]]
+        or a matrix (see `pymining.arrays`).
        :param key_func: a function that returns a comparable key for a
         transaction item.
        :param min_support: minimum support.
+       :param weighted: if True, transactions is a sequence of (count,
+        transaction) and each transaction is counted `count` times.
+       :param ingestion_stats: An `IngestionStats` collecting statistics
+        about the preprocessing. Default to None.
+       :param exclude: a collection of keys to ignore.
     '''
+    start = default_timer()
+    (baskets, frequencies, records) = _ingest(transactions, key_func,
+            weighted, exclude)
+    fptree = _build_fptree(baskets, frequencies, min_support)
+    if ingestion_stats is not None:
+        ingestion_stats._done(records, baskets, len(fptree[1]),
+                default_timer() - start)
+    return fptree
 
-    if key_func is None:
-        key_func = lambda e: e
-
-    asorted_seqs, frequencies = _sort_transactions_by_freq(transactions,
-            key_func, True, False, False)
-    transactions = [[item[1] for item in aseq if item[0] >= min_support] for
-            aseq in asorted_seqs]
 
+def _build_fptree(baskets, frequencies, min_support=2):
     root = FPNode(FPNode.root_key, None)
     heads = {}
     last_insert = {}
-    for transaction in transactions:
-        root.add_path(transaction, 0, len(transaction), heads, last_insert)
+    for (aseq, count) in _encode(baskets, frequencies, min_support, True):
+        transaction = [item[1] for item in aseq]
+        root.add_path(transaction, 0, len(transaction), heads, last_insert,
+                count)
 
     # Here, v[1] is = to the frequency
     sorted_heads = sorted(heads.values(), key=lambda v: (v[1], v[0].key))
@@ -446,7 +848,8 @@ def _prune_cond_tree(heads, min_support):
         merged_now = {}
 
 
-def fpgrowth(fptree, min_support=2, pruning=False):
+def fpgrowth(fptree, min_support=2, pruning=False, stats=None,
+        budget=None, include=None, memory_limit=None, checkpoint=None):
     '''Finds frequent item sets of items appearing in a list of transactions
        based on FP-Growth by Han et al.
 
@@ -454,29 +857,474 @@ def fpgrowth(fptree, min_support=2, pruning=False):
         `get_fptree`.
        :param min_support: The minimal support of a set.
        :param pruning: Perform a pruning operation. Default to False.
+       :param stats: A `MiningStats` collecting statistics about the search.
+        Default to None.
+       :param budget: A `budget.Budget` limiting the search. If given, the
+        result is a `budget.ItemsetReport`, flagged as incomplete if the
+        search was stopped. Default to None.
+       :param include: only find the item sets containing all these keys.
+        Only the transactions containing them are mined. The depths of
+        `stats` then start at the number of included keys.
+       :param memory_limit: the estimated size, in bytes, that the
+        conditional trees may take. The trees that do not fit are written to
+        temporary files, as weighted transactions, and mined at the end
+        (see `pymining.spill`). Default to None (no limit).
+       :param checkpoint: a `checkpoint.Checkpoint`, or the path of its
+        file. The progress is logged after each top-level item and, if the
+        file exists, the run it logs is resumed. Cannot be combined with
+        memory_limit. Default to None.
        :rtype: A set containing the frequent item sets and their support.
     '''
-    fis = set()
-    report = {}
-    _fpgrowth(fptree, fis, report, min_support, pruning)
+    if checkpoint is not None and memory_limit is not None:
+        raise ValueError('checkpoint and memory_limit cannot be combined')
+    if include:
+        (fptree, fis, report) = _include(_fptree_transactions(fptree),
+                include, min_support, budget, _build_fptree)
+        if fptree is None:
+            return report
+    else:
+        fis = set()
+        report = _new_report(budget)
+    if stats is not None:
+        # The top level items follow the included keys.
+        stats._top_depth = len(fis)
+    if checkpoint is not None:
+        fingerprint = _checkpoint.fingerprint(('fpgrowth', min_support,
+            sorted(include or ())), _fptree_transactions(fptree))
+        return _checkpointed(checkpoint, fingerprint, report, budget,
+                lambda checkpoint, logged: _fpgrowth(fptree, fis, logged,
+                    min_support, pruning, stats, budget, None, checkpoint))
+    if memory_limit is not None:
+        spill = _spill.SpillQueue(memory_limit)
+        try:
+            if budget is not None:
+                return _budget.run(budget, lambda: _fpgrowth_spilled(fptree,
+                    fis, report, min_support, pruning, stats, budget, spill),
+                    report)
+            _fpgrowth_spilled(fptree, fis, report, min_support, pruning,
+                    stats, None, spill)
+            return report
+        finally:
+            spill.close()
+    if budget is not None:
+        return _budget.run(budget, lambda: _fpgrowth(fptree, fis, report,
+            min_support, pruning, stats, budget), report)
+    _fpgrowth(fptree, fis, report, min_support, pruning, stats)
     return report
 
 
-def _fpgrowth(fptree, fis, report, min_support=2, pruning=True):
+def _fptree_transactions(fptree):
+    (root, _) = fptree
+    stack = [(root, ())]
+    while stack:
+        (node, path) = stack.pop()
+        # Number of transactions ending at this node.
+        count = node.count - sum(child.count for child in
+                node.children.values())
+        if count > 0 and node is not root:
+            yield (count, path)
+        for child in node.children.values():
+            stack.append((child, path + (child.key,)))
+
+
+def _fpgrowth(fptree, fis, report, min_support=2, pruning=True, stats=None,
+        budget=None, spill=None, checkpoint=None):
     (_, heads) = fptree
     n = 0
-    for (head_node, head_support) in heads.values():
+    # Skip the items completed by a previous run.
+    done = 0 if checkpoint is None else checkpoint.done
+    for (head_node, head_support) in islice(heads.values(), done, None):
+        done += 1
         if head_support < min_support:
+            if stats is not None and head_node is not None:
+                stats.items_pruned += 1
             continue
 
+        if stats is not None:
+            depth = len(fis)
+            stats._expand(depth, _chain_length(head_node))
+            start = default_timer()
         fis.add(head_node.key)
         #print('Report {0} with support {1}'.format(fis, head_support))
         report[frozenset(fis)] = head_support
-        new_heads = _init_heads(heads)
-        _create_cond_tree(head_node, new_heads, pruning)
-        if pruning:
-            _prune_cond_tree(new_heads, min_support)
-        n = n + 1 + _fpgrowth((None, new_heads), fis, report, min_support,
-                pruning)
+        if budget is not None:
+            budget.check(len(report))
+        size = 0 if spill is None else _cond_tree_size(head_node)
+        if spill is not None and spill.over(size):
+            codes = {key: i for (i, key) in enumerate(heads)}
+            spill.push((tuple(fis), list(heads)), ((count, [codes[key] for
+                key in path]) for (count, path) in _cond_paths(head_node)))
+            n = n + 1
+        else:
+            new_heads = _init_heads(heads)
+            _create_cond_tree(head_node, new_heads, pruning)
+            if pruning:
+                _prune_cond_tree(new_heads, min_support)
+            if spill is not None:
+                spill.live += size
+            n = n + 1 + _fpgrowth((None, new_heads), fis, report,
+                    min_support, pruning, stats, budget, spill)
+            if spill is not None:
+                spill.live -= size
         fis.remove(head_node.key)
+        if stats is not None and depth == stats._top_depth:
+            stats._top_level_done(head_node.key, default_timer() - start,
+                    report)
+        if checkpoint is not None:
+            checkpoint.save(done)
     return n
+
+
+def _cond_paths(head_node):
+    # Yields the (count, path from the root) of the nodes of a chain, i.e.,
+    # the transactions of its conditional tree.
+    while head_node is not None:
+        path = []
+        node = head_node.parent
+        while node.parent is not None:
+            path.append(node.key)
+            node = node.parent
+        if path:
+            path.reverse()
+            yield (head_node.count, path)
+        head_node = head_node.next_node
+
+
+def _cond_tree_size(head_node):
+    # Estimated size of the conditional tree of a chain (at most one node
+    # per ancestor).
+    return _NODE_BYTES * sum(len(path) for (_, path) in
+            _cond_paths(head_node))
+
+
+def _fpgrowth_spilled(fptree, fis, report, min_support, pruning, stats,
+        budget, spill):
+    _fpgrowth(fptree, fis, report, min_support, pruning, stats, budget,
+            spill)
+    for ((prefix, keys), paths) in spill:
+        new_heads = _init_heads(keys)
+        root = FPNode(FPNode.root_key, None)
+        last_insert = {}
+        for (count, path) in paths:
+            path = [keys[i] for i in path]
+            root.add_path(path, 0, len(path), new_heads, last_insert, count)
+        # Conditional trees are mined through the parents only. The
+        # children would keep the tree alive, in cycles, after its search.
+        root.children = {}
+        for (node, _) in new_heads.values():
+            while node is not None:
+                node.children = {}
+                node = node.next_node
+        if pruning:
+            _prune_cond_tree(new_heads, min_support)
+        spill.live = _NODE_BYTES * sum(_chain_length(node) for (node, _) in
+                new_heads.values())
+        _fpgrowth((None, new_heads), set(prefix), report, min_support,
+                pruning, stats, budget, spill)
+
+
+def _chain_length(node):
+    length = 0
+    while node is not None:
+        length += 1
+        node = node.next_node
+    return length
+
+
+# Indexed results of previous sweeps: {fingerprint: _SupportIndex}.
+_sweep_cache = OrderedDict()
+_SWEEP_CACHE_SIZE = 8
+
+
+class _SupportIndex(object):
+    '''Frequent item sets sorted by decreasing support. The report of any
+       threshold above the mined support is a prefix of this index.'''
+
+    def __init__(self, report, min_support):
+        self.min_support = min_support
+        self.entries = sorted(report.items(), key=lambda e: e[1],
+                reverse=True)
+        self.neg_supports = [-support for (_, support) in self.entries]
+
+    def report_at(self, min_support):
+        end = bisect_right(self.neg_supports, -min_support)
+        return dict(self.entries[:end])
+
+
+def _fingerprint(baskets):
+    digest = hashlib.sha1()
+    for (basket, count) in baskets.items():
+        digest.update(repr((sorted(basket), count)).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def clear_sweep_cache():
+    '''Forgets the results of all previous calls to `support_sweep`.'''
+    _sweep_cache.clear()
+
+
+def support_sweep(transactions, supports, key_func=None, use_cache=True):
+    '''Finds the frequent item sets for several minimal supports at once.
+       The transactions are preprocessed and mined with relim only once, at
+       the lowest support, and each higher support is answered by filtering
+       the result.
+
+       Results are cached by a fingerprint of the transactions, so sweeping
+       the same data again (at supports not lower than before) does not mine.
+
+       :param transactions: a sequence of sequences. [ [transaction items...]]
+       :param supports: the minimal supports to compute.
+       :param key_func: a function that returns a comparable key for a
+        transaction item.
+       :param use_cache: reuse and store results across calls. Default to
+        True.
+       :rtype: A dict, {min_support: report}, where each report is the same
+        as the one returned by `relim`.
+    '''
+    supports = sorted(set(supports))
+    if not supports:
+        return {}
+
+    (baskets, frequencies, _) = _ingest(transactions, key_func)
+    fingerprint = _fingerprint(baskets)
+
+    index = _sweep_cache.pop(fingerprint, None) if use_cache else None
+    if index is None or index.min_support > supports[0]:
+        report = relim(_build_relim_input(baskets, frequencies, supports[0]),
+                supports[0])
+        index = _SupportIndex(report, supports[0])
+    if use_cache:
+        # Most recently used last.
+        _sweep_cache[fingerprint] = index
+        while len(_sweep_cache) > _SWEEP_CACHE_SIZE:
+            _sweep_cache.popitem(last=False)
+
+    return {support: index.report_at(support) for support in supports}
+
+
+# Engine used by `mine` for each (dense, duplicated) regime. The defaults
+# come from the benchmarks of `pymining.benchmark`: run `calibrate` to
+# compute them on the current machine.
+_default_selection = {
+    'density_threshold': 0.08,
+    'duplicate_threshold': 0.25,
+    'engines': {
+        'sparse': 'relim',
+        'sparse_duplicated': 'sam',
+        'dense': 'relim',
+        'dense_duplicated': 'relim',
+        },
+    }
+_selection = dict(_default_selection)
+_selection['engines'] = dict(_default_selection['engines'])
+
+
+def get_dataset_stats(transactions):
+    '''Computes cheap statistics about a list of transactions: the number
+       of transactions (size), of distinct items (items), the average number
+       of items per transaction (avg_length), the density (avg_length /
+       items) and the fraction of transactions that are duplicates of an
+       earlier one (duplicate_rate).
+
+       :param transactions: a sequence of sets of keys.
+       :rtype: a dict.
+    '''
+    (baskets, frequencies, _) = _ingest(transactions)
+    return _basket_stats(baskets, frequencies)
+
+
+def _basket_stats(baskets, frequencies):
+    size = sum(baskets.values())
+    total = sum(frequencies.values())
+    avg_length = float(total) / size if size else 0.0
+    return {
+        'size': size,
+        'items': len(frequencies),
+        'avg_length': avg_length,
+        'density': avg_length / len(frequencies) if frequencies else 0.0,
+        'duplicate_rate': 1.0 - float(len(baskets)) / size if size else 0.0,
+        }
+
+
+def _regime(dataset_stats, selection):
+    regime = 'dense' if dataset_stats['density'] >= \
+        selection['density_threshold'] else 'sparse'
+    if dataset_stats['duplicate_rate'] >= selection['duplicate_threshold']:
+        regime += '_duplicated'
+    return regime
+
+
+def select_engine(dataset_stats, selection=None):
+    '''Returns the name of the engine ('relim', 'sam' or 'fpgrowth')
+       expected to be the fastest on a dataset.
+
+       :param dataset_stats: the statistics returned by `get_dataset_stats`.
+       :param selection: the thresholds and engines returned by
+        `calibrate`. Default to the current selection.
+    '''
+    if selection is None:
+        selection = _selection
+    return selection['engines'][_regime(dataset_stats, selection)]
+
+
+def mine(transactions, min_support=2, key_func=None, engine=None,
+        selection=None, weighted=False, ingestion_stats=None, include=None,
+        exclude=None, **kwargs):
+    '''Finds frequent item sets with the algorithm expected to be the
+       fastest on the transactions. The choice is based on the density and
+       on the duplicate rate of the transactions (see `select_engine`) and is
+       logged at the INFO level.
+
+       :param transactions: a sequence of sequences. [ [transaction items...]]
+        or a matrix (see `pymining.arrays`).
+       :param min_support: The minimal support of a set to be included.
+       :param key_func: a function that returns a comparable key for a
+        transaction item.
+       :param engine: force an engine ('relim', 'sam' or 'fpgrowth').
+       :param selection: the thresholds and engines returned by
+        `calibrate`. Default to the current selection.
+       :param weighted: if True, transactions is a sequence of (count,
+        transaction) and each transaction is counted `count` times.
+       :param ingestion_stats: An `IngestionStats` collecting statistics
+        about the preprocessing. Default to None.
+       :param include: only find the item sets containing all these keys.
+       :param exclude: a collection of keys to ignore.
+       :param kwargs: passed to the engine (e.g., stats or budget).
+       :rtype: A set containing the frequent item sets and their support.
+    '''
+    start = default_timer()
+    (baskets, frequencies, records) = _ingest(transactions, key_func,
+            weighted, exclude)
+    if include:
+        include = frozenset(include)
+        (support, baskets, frequencies) = _conditional(((count, basket) for
+            (basket, count) in baskets.items()), include)
+        if support < min_support:
+            return _new_report(kwargs.get('budget'))
+    if engine is None:
+        dataset_stats = _basket_stats(baskets, frequencies)
+        engine = select_engine(dataset_stats, selection)
+        if engine == 'sam' and kwargs.get('memory_limit') is not None:
+            # sam has no memory_limit.
+            engine = 'relim'
+        logger.info('Selected %s for %d transactions of %d items (density '
+                '%.3f, duplicate rate %.3f)', engine, dataset_stats['size'],
+                dataset_stats['items'], dataset_stats['density'],
+                dataset_stats['duplicate_rate'])
+    (build, miner) = _ENGINES[engine]
+    mining_input = build(baskets, frequencies, min_support)
+    if ingestion_stats is not None:
+        ingestion_stats._done(records, baskets,
+                _frequent_count(frequencies, min_support),
+                default_timer() - start)
+    report = miner(mining_input, min_support, **kwargs)
+    if include:
+        report = _add_include(report, include, support)
+    return report
+
+
+def _add_include(report, include, support):
+    if isinstance(report, _budget.ItemsetReport):
+        included = _budget.ItemsetReport()
+        included.complete = report.complete
+        included.reason = report.reason
+    else:
+        included = {}
+    included[include] = support
+    for (itemset, itemset_support) in report.items():
+        included[itemset.union(include)] = itemset_support
+    return included
+
+
+# {name: (input builder, miner)}
+_ENGINES = OrderedDict([
+    ('relim', (_build_relim_input, relim)),
+    ('sam', (_build_sam_input, sam)),
+    ('fpgrowth', (_build_fptree, fpgrowth)),
+    ])
+
+
+def _calibration_dataset(rand, density, duplicate_rate, size, length):
+    universe_size = max(length, int(round(length / density)))
+    unique = max(1, int(size * (1.0 - duplicate_rate)))
+    baskets = [rand.sample(range(universe_size), length) for _ in
+            range(unique)]
+    baskets.extend(rand.choice(baskets) for _ in range(size - unique))
+    return baskets
+
+
+def calibrate(densities=(0.02, 0.05, 0.1, 0.2, 0.4),
+        duplicate_rates=(0.0, 0.5, 0.9), size=300, length=8, repeats=3,
+        seed=0, apply=True):
+    '''Benchmarks the engines on random datasets of several densities and
+       duplicate rates on this machine, and derives the selection used by
+       `mine`: the density and duplicate rate thresholds that minimize the
+       total time when each regime uses its fastest engine.
+
+       :param densities: the densities of the benchmark datasets.
+       :param duplicate_rates: the duplicate rates of the benchmark
+        datasets.
+       :param size: the number of transactions of a dataset.
+       :param length: the number of items of a transaction. The density is
+        controlled by the number of distinct items.
+       :param repeats: the number of timed runs of each engine.
+       :param seed: the seed of the random datasets.
+       :param apply: use the result as the default selection of `mine`.
+       :rtype: the selection, a JSON-serializable dict.
+    '''
+    import random
+    from pymining.benchmark import measure
+
+    rand = random.Random(seed)
+    # [(density, duplicate_rate, {engine: median time})]
+    points = []
+    for density in densities:
+        for duplicate_rate in duplicate_rates:
+            (baskets, frequencies, _) = _ingest(_calibration_dataset(rand,
+                density, duplicate_rate, size, length))
+            dataset_stats = _basket_stats(baskets, frequencies)
+            min_support = max(2, int(size * density * 0.5))
+            times = {}
+            for engine in _ENGINES:
+                (build, miner) = _ENGINES[engine]
+                times[engine] = measure(lambda: miner(build(baskets,
+                    frequencies, min_support), min_support), warmup=1,
+                    repeats=repeats, memory=False)['median']
+            points.append((dataset_stats['density'],
+                dataset_stats['duplicate_rate'], times))
+
+    best = None
+    for density_threshold in _midpoints([p[0] for p in points]):
+        for duplicate_threshold in _midpoints([p[1] for p in points]):
+            selection = {'density_threshold': density_threshold,
+                    'duplicate_threshold': duplicate_threshold}
+            regimes = defaultdict(lambda: defaultdict(float))
+            for (density, duplicate_rate, times) in points:
+                regime = _regime({'density': density,
+                    'duplicate_rate': duplicate_rate}, selection)
+                for engine in times:
+                    regimes[regime][engine] += times[engine]
+            engines = dict(_default_selection['engines'])
+            total = 0.0
+            for regime in regimes:
+                engine = min(regimes[regime], key=regimes[regime].get)
+                engines[regime] = engine
+                total += regimes[regime][engine]
+            if best is None or total < best[0]:
+                selection['engines'] = engines
+                best = (total, selection)
+
+    selection = best[1]
+    logger.info('Calibrated engine selection: %s', selection)
+    if apply:
+        _selection.clear()
+        _selection.update(selection)
+    return selection
+
+
+def _midpoints(values):
+    values = sorted(set(values))
+    if len(values) < 2:
+        return values
+    return [(low + high) / 2.0 for (low, high) in zip(values, values[1:])]
@@ -0,0 +1,212 @@
+'''Partitioned frequent item set mining (the SON algorithm by Savasere,
+Omiecinski and Navathe).
+
+The transactions are split into chunks. Each chunk is mined with relim at a
+support proportional to its size: an item set that is frequent in all the
+transactions is frequent in at least one chunk, so the union of the local
+item sets contains all the frequent item sets. A second pass counts the
+exact support of these candidates in each chunk and sums the counts.
+
+`son` runs both passes with a process pool. The steps can also be run by
+another scheduler, e.g., one task per chunk::
+
+    >>> chunks = partition.split(transactions, 4)
+    >>> candidates = partition.merge_candidates(
+    ...     partition.mine_chunk(chunk, 10, len(transactions))
+    ...     for chunk in chunks)
+    >>> report = partition.merge_counts((partition.count_support(chunk,
+    ...     candidates) for chunk in chunks), 10)
+'''
+from collections import defaultdict
+import multiprocessing
+
+from pymining import arrays, counting, itemmining
+
+
+def split(transactions, chunks):
+    '''Splits transactions into contiguous chunks of (almost) equal size.
+
+       :param transactions: a sequence of sequences. [ [transaction items...]]
+        or a matrix (see `pymining.arrays`).
+       :param chunks: the number of chunks.
+       :rtype: a list of lists of transactions, or of `arrays.CSR` if
+        transactions is a matrix.
+    '''
+    if arrays.is_matrix(transactions):
+        return arrays.split(transactions, chunks)
+    transactions = list(transactions)
+    chunks = max(1, min(chunks, len(transactions)))
+    (size, extra) = divmod(len(transactions), chunks)
+    result = []
+    start = 0
+    for i in range(chunks):
+        end = start + size + (1 if i < extra else 0)
+        result.append(transactions[start:end])
+        start = end
+    return result
+
+
+def local_support(min_support, chunk_size, total_size):
+    '''Returns the support used to mine a chunk: the global support scaled
+       by the fraction of the transactions in the chunk, rounded up.'''
+    if not total_size:
+        return min_support
+    return max(1, -(-min_support * chunk_size // total_size))
+
+
+def mine_chunk(chunk, min_support, total_size, key_func=None):
+    '''First pass: finds the candidate item sets of a chunk.
+
+       :param chunk: a list of transactions or a matrix.
+       :param min_support: the global minimal support.
+       :param total_size: the number of transactions in all chunks.
+       :param key_func: a function that returns a comparable key for a
+        transaction item.
+       :rtype: a set of frozensets of keys.
+    '''
+    support = local_support(min_support, _size(chunk), total_size)
+    relim_input = itemmining.get_relim_input(chunk, key_func,
+            min_support=support)
+    return set(itemmining.relim(relim_input, support))
+
+
+def _size(chunk):
+    if arrays.is_matrix(chunk):
+        return arrays.row_count(chunk)
+    return len(chunk)
+
+
+def merge_candidates(candidate_sets):
+    '''Returns the union of the candidates found by `mine_chunk`.'''
+    candidates = set()
+    for candidate_set in candidate_sets:
+        candidates.update(candidate_set)
+    return candidates
+
+
+def count_support(chunk, candidates, key_func=None, weighted=False):
+    '''Second pass: counts the support of each candidate in a chunk.
+
+       :param chunk: a list of transactions.
+       :param candidates: a collection of frozensets of keys.
+       :param key_func: a function that returns a comparable key for a
+        transaction item.
+       :param weighted: chunk is a list of (count, transaction).
+       :rtype: a dict, {candidate: support in the chunk}.
+    '''
+    return counting.count_supports(candidates, chunk, key_func, weighted)
+
+
+def merge_counts(chunk_supports, min_support):
+    '''Sums the supports returned by `count_support` for each chunk and
+       keeps the frequent item sets.
+
+       :rtype: a dict, {itemset: support}, like `itemmining.relim`.
+    '''
+    supports = defaultdict(int)
+    for chunk_support in chunk_supports:
+        for (candidate, support) in chunk_support.items():
+            supports[candidate] += support
+    return {candidate: support for (candidate, support) in supports.items()
+            if support >= min_support}
+
+
+def son(transactions, min_support=2, chunks=None, workers=None,
+        key_func=None, shared=False, context=None):
+    '''Finds frequent item sets by mining chunks of the transactions in
+       parallel.
+
+       :param transactions: a sequence of sequences. [ [transaction items...]]
+        or a matrix (see `pymining.arrays`).
+       :param min_support: The minimal support of a set to be included.
+       :param chunks: the number of chunks. Default to the number of
+        workers.
+       :param workers: the number of processes. If None or 1, the chunks
+        are mined in this process.
+       :param key_func: a function that returns a comparable key for a
+        transaction item. It must be picklable if workers > 1.
+       :param shared: with workers > 1, put the distinct transactions in a
+        `shm.TransactionStore` that the workers read in place, instead of
+        sending each worker its chunks (Python 3.8+).
+       :param context: a `multiprocessing` context, e.g.,
+        `multiprocessing.get_context('spawn')`. Default to the default start
+        method.
+       :rtype: A dict containing the frequent item sets and their support.
+    '''
+    if chunks is None:
+        chunks = workers or 1
+    if shared and workers is not None and workers > 1:
+        return _son_shared(transactions, min_support, chunks, workers,
+                key_func, context)
+    chunk_list = split(transactions, chunks)
+    total_size = sum(_size(chunk) for chunk in chunk_list)
+
+    if workers is None or workers <= 1:
+        candidates = merge_candidates(mine_chunk(chunk, min_support,
+            total_size, key_func) for chunk in chunk_list)
+        return merge_counts((count_support(chunk, candidates, key_func) for
+            chunk in chunk_list), min_support)
+
+    pool = (context or multiprocessing).Pool(workers, _init_worker,
+            (min_support, total_size, key_func))
+    try:
+        candidates = merge_candidates(pool.imap_unordered(_mine_task,
+            chunk_list))
+        # One task per chunk, so the candidates are sent about once per
+        # worker.
+        report = merge_counts(pool.imap_unordered(_count_task, [(chunk,
+            candidates) for chunk in chunk_list]), min_support)
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+    return report
+
+
+_worker_input = None
+
+
+def _init_worker(min_support, total_size, key_func):
+    global _worker_input
+    _worker_input = (min_support, total_size, key_func)
+
+
+def _mine_task(chunk):
+    (min_support, total_size, key_func) = _worker_input
+    return mine_chunk(chunk, min_support, total_size, key_func)
+
+
+def _count_task(task):
+    (chunk, candidates) = task
+    return count_support(chunk, candidates, _worker_input[2])
+
+
+def _son_shared(transactions, min_support, chunks, workers, key_func,
+        context):
+    from pymining import shm
+    store = shm.TransactionStore.create(transactions, key_func)
+    total_size = store.transaction_count()
+    ranges = [(start, stop, min_support, total_size) for (start, stop) in
+            store.split(chunks)]
+    with shm.StorePool(store, workers, context=context) as pool:
+        candidates = merge_candidates(pool.imap_unordered(_mine_range,
+            ranges))
+        return merge_counts(pool.imap_unordered(_count_range, [(start, stop,
+            candidates) for (start, stop, _, _) in ranges]), min_support)
+
+
+def _mine_range(store, task):
+    (start, stop, min_support, total_size) = task
+    support = local_support(min_support, store.transaction_count(start,
+        stop), total_size)
+    return set(itemmining.relim(store.relim_input(start, stop, support),
+        support))
+
+
+def _count_range(store, task):
+    (start, stop, candidates) = task
+    return count_support(store.iter_transactions(start, stop), candidates,
+            weighted=True)
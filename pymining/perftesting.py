@@ -1,9 +1,8 @@
-from time import time
 import random
 import string
 from pymining.itemmining import _fpgrowth, get_fptree, _relim,\
-        get_relim_input, _sam, get_sam_input
-from pymining.compat import range
+        _relim_scratch, get_relim_input, _sam, get_sam_input
+from pymining.compat import numpy
 
 
 def get_default_transactions():
@@ -75,6 +74,211 @@ def get_random_transactions(transaction_number=500,
     return transactions
 
 
+def _check_numpy():
+    if numpy is None:
+        raise ImportError('the vectorized generators require numpy')
+
+
+def _batches(number, batch_size):
+    while number > 0:
+        size = min(number, batch_size)
+        yield size
+        number -= size
+
+
+def _zipf_probabilities(universe_size, exponent):
+    weights = 1.0 / numpy.arange(1, universe_size + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _split(items, owners, number):
+    # Groups items (sorted by owner, 0 <= owner < number) in a list of
+    # tuples of Python integers.
+    items = items.tolist()
+    ends = numpy.cumsum(numpy.bincount(owners, minlength=number)).tolist()
+    starts = [0] + ends[:-1]
+    return [tuple(items[start:end]) for (start, end) in zip(starts, ends)]
+
+
+def iter_zipf_transactions(transaction_number=100000, universe_size=1000,
+        avg_length=10, exponent=1.0, seed=None, batch_size=100000):
+    '''Generates `transaction_number` random transactions. The number of
+       items in a transaction follows a Poisson distribution of mean
+       `avg_length`, and the popularity of the items (integers from 0 to
+       `universe_size` - 1) follows a Zipf law of parameter `exponent`: item
+       0 is the most popular. Duplicate items are removed.
+
+       Transactions are generated `batch_size` at a time with numpy, so
+       millions of transactions take seconds and memory is bounded by a
+       batch. The same `seed` and `batch_size` give the same transactions.
+
+       :rtype: An iterator of tuples of integers.
+    '''
+    _check_numpy()
+    rand = numpy.random.RandomState(seed)
+    probabilities = _zipf_probabilities(universe_size, exponent)
+    for size in _batches(transaction_number, batch_size):
+        lengths = rand.poisson(avg_length, size)
+        items = rand.choice(universe_size, lengths.sum(), p=probabilities)
+        owners = numpy.repeat(numpy.arange(size), lengths)
+        # Sort by transaction, then by item, to drop duplicate items.
+        order = numpy.lexsort((items, owners))
+        items = items[order]
+        owners = owners[order]
+        keep = numpy.ones(len(items), dtype=bool)
+        keep[1:] = (items[1:] != items[:-1]) | (owners[1:] != owners[:-1])
+        for transaction in _split(items[keep], owners[keep], size):
+            yield transaction
+
+
+def get_zipf_transactions(*args, **kwargs):
+    '''Returns the list of transactions generated by
+       `iter_zipf_transactions`.'''
+    return list(iter_zipf_transactions(*args, **kwargs))
+
+
+def _get_patterns(rand, pattern_number, universe_size, avg_pattern_length,
+        correlation, exponent):
+    # Pool of patterns in the style of the IBM Quest generator: a pattern
+    # reuses a fraction of the items of the previous one (exponentially
+    # distributed with mean `correlation`), the rest is drawn from a Zipf
+    # law. Patterns have exponentially distributed weights.
+    probabilities = _zipf_probabilities(universe_size, exponent)
+    lengths = numpy.maximum(rand.poisson(avg_pattern_length, pattern_number),
+            1)
+    patterns = []
+    previous = []
+    for length in lengths:
+        reused = min(int(round(min(rand.exponential(correlation), 1.0) *
+            length)), len(previous))
+        pattern = list(rand.permutation(previous)[:reused]) if reused else []
+        pattern.extend(rand.choice(universe_size, length - reused,
+            p=probabilities))
+        patterns.append(pattern)
+        previous = pattern
+    offsets = numpy.concatenate(([0], numpy.cumsum(lengths)))
+    items = numpy.concatenate([numpy.array(pattern, dtype=numpy.int64) for
+        pattern in patterns])
+    weights = rand.exponential(1.0, pattern_number)
+    return (items, offsets, lengths, weights / weights.sum())
+
+
+def _draw_patterns(rand, patterns, lengths, avg_pattern_length):
+    # Chooses patterns for sequences/transactions of the given lengths.
+    # Returns the concatenated items, the index of their pattern in the
+    # draw and the index of their sequence/transaction.
+    (items, offsets, pattern_lengths, weights) = patterns
+    counts = numpy.maximum(numpy.rint(lengths / avg_pattern_length), 1)
+    counts = counts.astype(numpy.int64)
+    ids = rand.choice(len(weights), counts.sum(), p=weights)
+    drawn_lengths = pattern_lengths[ids]
+    total = drawn_lengths.sum()
+    starts = offsets[ids] - (numpy.cumsum(drawn_lengths) - drawn_lengths)
+    draws = numpy.repeat(numpy.arange(len(ids)), drawn_lengths)
+    drawn_items = items[numpy.arange(total) + starts[draws]]
+    owners = numpy.repeat(numpy.repeat(numpy.arange(len(lengths)), counts),
+            drawn_lengths)
+    return (drawn_items, ids[draws], owners)
+
+
+def iter_quest_transactions(transaction_number=100000, universe_size=1000,
+        avg_length=10, pattern_number=2000, avg_pattern_length=4,
+        correlation=0.5, corruption=0.5, exponent=1.0, seed=None,
+        batch_size=100000):
+    '''Generates random transactions with correlated items, in the style of
+       the IBM Quest generator (Agrawal and Srikant, VLDB'94).
+
+       A pool of `pattern_number` potentially frequent item sets is built
+       first. Each transaction (with a size following a Poisson distribution
+       of mean `avg_length`) is made of patterns from the pool chosen by
+       weight. When a pattern is added, each of its items is dropped with a
+       probability specific to the pattern (normally distributed around
+       `corruption`).
+
+       :rtype: An iterator of tuples of integers.
+    '''
+    _check_numpy()
+    rand = numpy.random.RandomState(seed)
+    patterns = _get_patterns(rand, pattern_number, universe_size,
+            avg_pattern_length, correlation, exponent)
+    corruptions = numpy.clip(rand.normal(corruption, 0.1, pattern_number),
+            0.0, 1.0)
+    for size in _batches(transaction_number, batch_size):
+        lengths = rand.poisson(avg_length, size)
+        # Corrupted items are dropped: draw more patterns to compensate.
+        (items, ids, owners) = _draw_patterns(rand, patterns, lengths,
+                avg_pattern_length * max(1.0 - corruption, 0.1))
+        keep = rand.random_sample(len(items)) >= corruptions[ids]
+        items = items[keep]
+        owners = owners[keep]
+        order = numpy.lexsort((items, owners))
+        items = items[order]
+        owners = owners[order]
+        keep = numpy.ones(len(items), dtype=bool)
+        keep[1:] = (items[1:] != items[:-1]) | (owners[1:] != owners[:-1])
+        for transaction in _split(items[keep], owners[keep], size):
+            yield transaction
+
+
+def get_quest_transactions(*args, **kwargs):
+    '''Returns the list of transactions generated by
+       `iter_quest_transactions`.'''
+    return list(iter_quest_transactions(*args, **kwargs))
+
+
+def iter_random_sequences(sequence_number=100000, universe_size=1000,
+        avg_length=10, pattern_number=500, avg_pattern_length=4, noise=0.25,
+        exponent=1.0, seed=None, batch_size=100000):
+    '''Generates random sequences made of sequential patterns. A pool of
+       `pattern_number` patterns is built as in `iter_quest_transactions`
+       and each sequence concatenates patterns chosen by weight until its
+       length (Poisson distributed of mean `avg_length`) is reached. Each item
+       is then replaced by a random item (from a Zipf law) with a probability
+       of `noise`.
+
+       :rtype: An iterator of tuples of integers.
+    '''
+    _check_numpy()
+    rand = numpy.random.RandomState(seed)
+    patterns = _get_patterns(rand, pattern_number, universe_size,
+            avg_pattern_length, 0.5, exponent)
+    probabilities = _zipf_probabilities(universe_size, exponent)
+    for size in _batches(sequence_number, batch_size):
+        lengths = rand.poisson(avg_length, size)
+        (items, _, owners) = _draw_patterns(rand, patterns, lengths,
+                float(avg_pattern_length))
+        noisy = rand.random_sample(len(items)) < noise
+        items[noisy] = rand.choice(universe_size, noisy.sum(),
+                p=probabilities)
+        for sequence in _split(items, owners, size):
+            yield sequence
+
+
+def get_random_sequences(*args, **kwargs):
+    '''Returns the list of sequences generated by `iter_random_sequences`.
+    '''
+    return list(iter_random_sequences(*args, **kwargs))
+
+
+def write_transactions(transactions, path, separator=' '):
+    '''Writes transactions (or sequences) to a file, one per line, as they
+       are generated.
+
+       :param transactions: an iterable of sequences, e.g., the iterator
+        returned by `iter_zipf_transactions`.
+       :param path: the path of the file.
+       :param separator: the string between two items.
+       :rtype: the number of transactions written.
+    '''
+    count = 0
+    with open(path, 'w') as output:
+        for transaction in transactions:
+            output.write(separator.join(str(item) for item in transaction))
+            output.write('\n')
+            count += 1
+    return count
+
+
 def test_sam(should_print=False, ts=None, support=2):
     if ts is None:
         ts = get_default_transactions()
@@ -94,7 +298,7 @@ def test_relim(should_print=False, ts=None, support=2):
     relim_input = get_relim_input(ts, lambda e: e)
     fis = set()
     report = {}
-    n = _relim(relim_input, fis, report, support)
+    n = _relim(_relim_scratch(relim_input), fis, report, support)
     if should_print:
         print(n)
         print(report)
@@ -115,9 +319,10 @@ def test_fpgrowth(should_print=False, ts=None, support=2, pruning=False):
 
 
 def test_itemset_perf(perf_round=10, sparse=True, seed=None):
-    '''Non-scientifically tests the performance of three algorithms by running
-       `perf_round` rounds of FP-Growth, FP-Growth without pruning, Relim, and
-       SAM.
+    '''Tests the performance of four algorithms by running `perf_round`
+       rounds of FP-Growth, FP-Growth without pruning, Relim, and SAM, after
+       one warmup round. Prints the median time and the IQR of each
+       algorithm. See `pymining.benchmark` for more options.
 
        A random set of transactions is created (the same is obviously used
        for all algorithms).
@@ -128,6 +333,8 @@ def test_itemset_perf(perf_round=10, sparse=True, seed=None):
        The `seed` parameter can be used to obtain the same sample across
        multiple calls.
     '''
+    from pymining import benchmark
+
     random.seed(seed)
 
     if sparse:
@@ -144,36 +351,8 @@ def test_itemset_perf(perf_round=10, sparse=True, seed=None):
             key_alphabet=None)
     print('Random transactions generated with seed {0}\n'.format(seed))
 
-    start = time()
-    for i in range(perf_round):
-        (n, report) = test_fpgrowth(False, transactions, support,
-                pruning=True)
-        print('Done round {0}'.format(i))
-    end = time()
-    print('FP-Growth (pruning on) took: {0}'.format(end - start))
-    print('Computed {0} frequent item sets.'.format(n))
-
-    start = time()
-    for i in range(perf_round):
-        (n, report) = test_fpgrowth(False, transactions, support,
-                pruning=False)
-        print('Done round {0}'.format(i))
-    end = time()
-    print('FP-Growth (pruning off) took: {0}'.format(end - start))
-    print('Computed {0} frequent item sets.'.format(n))
-
-    start = time()
-    for i in range(perf_round):
-        (n, report) = test_relim(False, transactions, support)
-        print('Done round {0}'.format(i))
-    end = time()
-    print('Relim took: {0}'.format(end - start))
-    print('Computed {0} frequent item sets.'.format(n))
-
-    start = time()
-    for i in range(perf_round):
-        (n, report) = test_sam(False, transactions, support)
-        print('Done round {0}'.format(i))
-    end = time()
-    print('Sam took: {0}'.format(end - start))
-    print('Computed {0} frequent item sets.'.format(n))
+    name = 'sparse' if sparse else 'dense'
+    results = benchmark.run_benchmarks({name: (transactions, support)},
+            ['fpgrowth_pruning', 'fpgrowth', 'relim', 'sam'],
+            repeats=perf_round, verbose=True)
+    return results
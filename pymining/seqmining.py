@@ -1,40 +1,324 @@
-from collections import defaultdict
+from bisect import bisect_left
+from collections import defaultdict, Counter
+import heapq
+from multiprocessing import Pool
+from pymining.compat import numpy
+from pymining import budget as _budget
 
 
-def freq_seq_enum(sequences, min_support):
+# A projected database is split among workers when it is larger than
+# 1 / (workers * _SPLIT_FACTOR) of the whole first level, until there are
+# about workers * _SPLIT_FACTOR tasks.
+_SPLIT_FACTOR = 4
+
+# (max_gap, max_span, max_length)
+_NO_CONSTRAINTS = (None, None, None)
+
+
+def freq_seq_enum(sequences, min_support, workers=None, max_gap=None,
+        max_span=None, max_length=None, budget=None):
     '''Enumerates all frequent sequences.
 
+       The optional constraints are enforced during the search, so
+       sequences violating them are never extended. A sequence is counted
+       once in each input sequence containing it under the constraints.
+
        :param sequences: A sequence of sequences.
        :param min_support: The minimal support of a set to be included.
+       :param workers: The number of processes to use. The projected
+        databases of the first prefixes are mined in parallel and large ones
+        are split further. Default to None (no process is started).
+       :param max_gap: The maximal distance between the positions of two
+        consecutive items (1 means adjacent items). Default to None.
+       :param max_span: The maximal distance between the positions of the
+        first and the last items. Default to None.
+       :param max_length: The maximal number of items in a frequent
+        sequence. Default to None.
+       :param budget: A `budget.Budget` limiting the search. If given, the
+        result is a `budget.SequenceReport`, flagged as incomplete if the
+        search was stopped. With workers, the budget is checked each time a
+        worker returns. Default to None.
        :rtype: A set of (frequent_sequence, support).
     '''
+    constraints = (max_gap, max_span, max_length)
+    sdb = _get_seq_input(sequences)
+    pdb = _initial_pdb(sdb, constraints)
+
+    def mine():
+        if workers is not None and workers > 1:
+            _parallel_freq_seq(sdb, pdb, min_support, workers, freq_seqs,
+                    constraints, budget)
+        else:
+            _freq_seq(sdb, pdb, tuple(), 0, min_support, freq_seqs,
+                    constraints, budget)
+
+    if budget is not None:
+        freq_seqs = _budget.SequenceReport()
+        return _budget.run(budget, mine, freq_seqs)
     freq_seqs = set()
-    _freq_seq(sequences, tuple(), 0, min_support, freq_seqs)
+    mine()
     return freq_seqs
 
 
-def _freq_seq(sdb, prefix, prefix_support, min_support, freq_seqs):
+def iter_freq_seq(sequences, min_support, max_gap=None, max_span=None,
+        max_length=None, budget=None):
+    '''Generates the frequent sequences one at a time, in depth-first
+       order, without keeping the ones already generated. Only the
+       projected databases of the current prefix and of its ancestors are
+       kept in memory.
+
+       See `freq_seq_enum` for the parameters. If the budget is exhausted,
+       the iteration stops and `budget.reason` tells why.
+
+       :rtype: An iterator of (frequent_sequence, support).
+    '''
+    constraints = (max_gap, max_span, max_length)
+    sdb = _get_seq_input(sequences)
+    pdb = _initial_pdb(sdb, constraints)
+    freq_seqs = _iter_freq_seq(sdb, pdb, tuple(), 0, min_support,
+            constraints, budget)
+    if budget is None:
+        return freq_seqs
+    return _iter_within_budget(budget, freq_seqs)
+
+
+def _iter_within_budget(budget, freq_seqs):
+    try:
+        budget.start()
+        for freq_seq in freq_seqs:
+            yield freq_seq
+    except _budget.BudgetExceeded:
+        return
+
+
+def freq_closed_seq_enum(sequences, min_support, budget=None):
+    '''Enumerates all frequent closed sequences, i.e., the frequent
+       sequences that are not contained in a longer sequence with the same
+       support. Uses the bidirectional extension checking and the BackScan
+       pruning of BIDE, so non-closed prefixes are not stored and most
+       branches without closed sequences are not explored.
+
+       :param sequences: A sequence of sequences.
+       :param min_support: The minimal support of a set to be included.
+       :param budget: A `budget.Budget` limiting the search. See
+        `freq_seq_enum`. Default to None.
+       :rtype: A set of (frequent_closed_sequence, support).
+    '''
+    sdb = _get_seq_input(sequences)
+    pdb = _initial_pdb(sdb, _NO_CONSTRAINTS)
+    if budget is not None:
+        closed_seqs = _budget.SequenceReport()
+        return _budget.run(budget, lambda: _bide(sdb, pdb, tuple(), 0,
+            min_support, closed_seqs, budget), closed_seqs)
+    closed_seqs = set()
+    _bide(sdb, pdb, tuple(), 0, min_support, closed_seqs)
+    return closed_seqs
+
+
+def spade(sequences, min_support, budget=None):
+    '''Enumerates all frequent sequences with the vertical approach of SPADE
+       by Zaki. Each sequence is represented by the list of (sid, position)
+       where its last item occurs, and the lists of longer sequences are
+       computed by temporal joins on NumPy arrays. Faster than
+       `freq_seq_enum` on many short sequences.
+
+       Requires numpy.
+
+       :param sequences: A sequence of sequences.
+       :param min_support: The minimal support of a set to be included.
+       :param budget: A `budget.Budget` limiting the search. See
+        `freq_seq_enum`. Default to None.
+       :rtype: A set of (frequent_sequence, support), the same as
+        `freq_seq_enum`.
+    '''
+    if numpy is None:
+        raise ImportError('spade requires numpy')
+    atoms = []
+    for (item, idlist) in _get_idlists(sequences):
+        support = _idlist_support(idlist)
+        if support >= min_support:
+            atoms.append(((item,), support, idlist))
+    if budget is not None:
+        freq_seqs = _budget.SequenceReport()
+        return _budget.run(budget, lambda: _spade(atoms, min_support,
+            freq_seqs, budget), freq_seqs)
+    freq_seqs = set()
+    _spade(atoms, min_support, freq_seqs)
+    return freq_seqs
+
+
+def _get_idlists(sequences):
+    # Id-list of an item: (sids, positions), two arrays sorted by sid, then
+    # by position.
+    codes = {}
+    items = []
+    sids = []
+    positions = []
+    for (sid, sequence) in enumerate(sequences):
+        for (position, item) in enumerate(sequence):
+            code = codes.get(item)
+            if code is None:
+                code = codes[item] = len(codes)
+            items.append(code)
+            sids.append(sid)
+            positions.append(position)
+    items = numpy.array(items, dtype=numpy.int64)
+    sids = numpy.array(sids, dtype=numpy.int64)
+    positions = numpy.array(positions, dtype=numpy.int64)
+    order = numpy.argsort(items, kind='stable')
+    bounds = numpy.searchsorted(items[order], numpy.arange(len(codes) + 1))
+    idlists = []
+    for (item, code) in codes.items():
+        selection = order[bounds[code]:bounds[code + 1]]
+        idlists.append((item, (sids[selection], positions[selection])))
+    return idlists
+
+
+def _idlist_support(idlist):
+    sids = idlist[0]
+    if len(sids) == 0:
+        return 0
+    return int(numpy.count_nonzero(sids[1:] != sids[:-1])) + 1
+
+
+def _temporal_join(prefix_idlist, idlist):
+    # Keeps the occurrences of idlist that come after the first occurrence
+    # of the prefix in the same sequence.
+    (prefix_sids, prefix_positions) = prefix_idlist
+    (sids, positions) = idlist
+    if len(prefix_sids) == 0:
+        return (sids[:0], positions[:0])
+    firsts = numpy.flatnonzero(numpy.concatenate(([True],
+        prefix_sids[1:] != prefix_sids[:-1])))
+    first_sids = prefix_sids[firsts]
+    first_positions = prefix_positions[firsts]
+    k = numpy.searchsorted(first_sids, sids)
+    k = numpy.minimum(k, len(first_sids) - 1)
+    mask = (first_sids[k] == sids) & (positions > first_positions[k])
+    return (sids[mask], positions[mask])
+
+
+def _spade(atoms, min_support, freq_seqs, budget=None):
+    # atoms: the frequent sequences sharing the same prefix, which differ
+    # only by their last item. Their extensions are the joins between
+    # atoms: (prefix, x, y) occurs where (prefix, y) occurs after an
+    # occurrence of (prefix, x).
+    for (sequence, support, idlist) in atoms:
+        freq_seqs.add((sequence, support))
+        if budget is not None:
+            budget.check(len(freq_seqs))
+        new_atoms = []
+        for (other, _, other_idlist) in atoms:
+            new_idlist = _temporal_join(idlist, other_idlist)
+            new_support = _idlist_support(new_idlist)
+            if new_support >= min_support:
+                new_atoms.append((sequence + other[-1:], new_support,
+                    new_idlist))
+        if new_atoms:
+            _spade(new_atoms, min_support, freq_seqs, budget)
+
+
+def _get_seq_input(sequences):
+    # Data Structure
+    # sdb[0][sid] = sequence
+    # sdb[1][sid] = {item: [positions of item in sequence]}
+    # sdb[2][sid] = ([last positions, ascending], [items in the same order])
+    #
+    # A projected database is a list of (sid, offset): the rest of
+    # sequence sid starting at offset. Positions are sorted so the next
+    # occurrence of an item after an offset is found with a binary search,
+    # and the items still present after an offset are a suffix of sdb[2].
+    seqs = []
+    indexes = []
+    lasts = []
+    for sequence in sequences:
+        index = defaultdict(list)
+        for position, item in enumerate(sequence):
+            index[item].append(position)
+        last = sorted((positions[-1], item) for (item, positions) in
+                index.items())
+        seqs.append(sequence)
+        indexes.append(dict(index))
+        lasts.append(([p for (p, _) in last], [item for (_, item) in last]))
+    return (seqs, indexes, lasts)
+
+
+def _is_windowed(constraints):
+    return constraints[0] is not None or constraints[1] is not None
+
+
+def _initial_pdb(sdb, constraints):
+    # With a gap or a span constraint, the first occurrence of a prefix is
+    # not enough: a later occurrence may be the only one close enough to
+    # the next item. Entries are then (sid, offset, embeddings) where
+    # embeddings is a list of (start, end) positions of the prefix, keeping
+    # the latest start for each end, and offset is the first end + 1.
+    if _is_windowed(constraints):
+        return [(sid, 0, None) for sid in range(len(sdb[0]))]
+    else:
+        return [(sid, 0) for sid in range(len(sdb[0]))]
+
+
+def _freq_seq(sdb, pdb, prefix, prefix_support, min_support, freq_seqs,
+        constraints=_NO_CONSTRAINTS, budget=None):
+    freq_seqs.update(_iter_freq_seq(sdb, pdb, prefix, prefix_support,
+        min_support, constraints, budget))
+
+
+def _iter_freq_seq(sdb, pdb, prefix, prefix_support, min_support,
+        constraints=_NO_CONSTRAINTS, budget=None):
+    # Depth-first search with an explicit stack. A frame holds the
+    # projected database of a prefix and its remaining frequent items: a
+    # child database is only built when the child is visited.
+    max_length = constraints[2]
+    count = 0
     if prefix:
-        freq_seqs.add((prefix, prefix_support))
-    locally_frequents = _local_freq_items(sdb, prefix, min_support)
-    if not locally_frequents:
+        yield (prefix, prefix_support)
+        count += 1
+    if max_length is not None and len(prefix) >= max_length:
         return
-    for (item, support) in locally_frequents:
-        new_prefix = prefix + tuple(item)
-        new_sdb = _project(sdb, new_prefix)
-        _freq_seq(new_sdb, new_prefix, support, min_support, freq_seqs)
+    stack = [(pdb, prefix, iter(_local_freq_items(sdb, pdb, min_support,
+        constraints)))]
+    while stack:
+        (pdb, prefix, items) = stack[-1]
+        frequent = next(items, None)
+        if frequent is None:
+            stack.pop()
+            continue
+        (item, support) = frequent
+        new_prefix = prefix + (item,)
+        if budget is not None:
+            budget.check(count)
+        yield (new_prefix, support)
+        count += 1
+        if max_length is not None and len(new_prefix) >= max_length:
+            continue
+        new_pdb = _project(sdb, pdb, item, constraints)
+        if new_pdb:
+            stack.append((new_pdb, new_prefix, iter(_local_freq_items(sdb,
+                new_pdb, min_support, constraints))))
 
 
-def _local_freq_items(sdb, prefix, min_support):
-    items = defaultdict(int)
+def _local_freq_items(sdb, pdb, min_support, constraints=_NO_CONSTRAINTS):
+    items = Counter()
     freq_items = []
-    for entry in sdb:
-        visited = set()
-        for element in entry:
-            if element not in visited:
-                items[element] += 1
-                visited.add(element)
-    # Sorted is optional. Just useful for debugging for now.
+    if _is_windowed(constraints):
+        seqs = sdb[0]
+        for (sid, _, embeddings) in pdb:
+            sequence = seqs[sid]
+            if embeddings is None:
+                items.update(sdb[1][sid].keys())
+                continue
+            window_items = set()
+            for (start, end) in embeddings:
+                window_items.update(sequence[end + 1:_window_end(start, end,
+                    len(sequence), constraints)])
+            items.update(window_items)
+    else:
+        lasts = sdb[2]
+        for (sid, offset) in pdb:
+            (last_positions, last_items) = lasts[sid]
+            items.update(last_items[bisect_left(last_positions, offset):])
     for item in items:
         support = items[item]
         if support >= min_support:
@@ -42,19 +326,203 @@ def _local_freq_items(sdb, prefix, min_support):
     return freq_items
 
 
-def _project(sdb, prefix):
-    new_sdb = []
-    if not prefix:
-        return sdb
-    current_prefix_item = prefix[-1]
-    for entry in sdb:
-        j = 0
-        projection = None
-        for item in entry:
-            if item == current_prefix_item:
-                projection = entry[j + 1:]
+def _window_end(start, end, length, constraints):
+    # Exclusive end of the positions where the next item may appear.
+    (max_gap, max_span, _) = constraints
+    window_end = length
+    if max_gap is not None:
+        window_end = min(window_end, end + max_gap + 1)
+    if max_span is not None:
+        window_end = min(window_end, start + max_span + 1)
+    return window_end
+
+
+def _project(sdb, pdb, item, constraints=_NO_CONSTRAINTS, keep_empty=False):
+    if _is_windowed(constraints):
+        return _project_windowed(sdb, pdb, item, constraints)
+    (seqs, indexes, _) = sdb
+    new_pdb = []
+    for (sid, offset) in pdb:
+        positions = indexes[sid].get(item)
+        if positions is None:
+            continue
+        i = bisect_left(positions, offset)
+        if i < len(positions):
+            new_offset = positions[i] + 1
+            # Empty projections cannot contribute to longer sequences.
+            if keep_empty or new_offset < len(seqs[sid]):
+                new_pdb.append((sid, new_offset))
+    return new_pdb
+
+
+def _project_windowed(sdb, pdb, item, constraints):
+    (seqs, indexes, _) = sdb
+    new_pdb = []
+    for (sid, _, embeddings) in pdb:
+        positions = indexes[sid].get(item)
+        if positions is None:
+            continue
+        length = len(seqs[sid])
+        if embeddings is None:
+            starts = {position: position for position in positions}
+        else:
+            starts = {}
+            for (start, end) in embeddings:
+                window_end = _window_end(start, end, length, constraints)
+                i = bisect_left(positions, end + 1)
+                while i < len(positions) and positions[i] < window_end:
+                    position = positions[i]
+                    if starts.get(position, -1) < start:
+                        starts[position] = start
+                    i += 1
+        new_embeddings = [(starts[end], end) for end in sorted(starts) if
+                end + 1 < length]
+        if new_embeddings:
+            new_pdb.append((sid, new_embeddings[0][1] + 1, new_embeddings))
+    return new_pdb
+
+
+def _bide(sdb, pdb, prefix, prefix_support, min_support, closed_seqs,
+        budget=None):
+    # pdb must contain every sequence supporting the prefix, even those
+    # where the prefix ends on the last item: they bound the backward
+    # extensions.
+    locally_frequents = _local_freq_items(sdb, pdb, min_support)
+    if prefix:
+        forward = any(support == prefix_support for (_, support) in
+                locally_frequents)
+        if not forward and not _backward_extension(sdb, pdb, prefix, True):
+            closed_seqs.add((prefix, prefix_support))
+            if budget is not None:
+                budget.check(len(closed_seqs))
+    for (item, support) in locally_frequents:
+        new_prefix = prefix + (item,)
+        new_pdb = _project(sdb, pdb, item, keep_empty=True)
+        # BackScan: an item can be inserted before the prefix in all
+        # sequences, so no extension of this prefix is closed.
+        if _backward_extension(sdb, new_pdb, new_prefix, False):
+            continue
+        _bide(sdb, new_pdb, new_prefix, support, min_support, closed_seqs,
+                budget)
+
+
+def _backward_extension(sdb, pdb, prefix, maximum):
+    # Looks for an item appearing in the i-th maximum period (maximum=True)
+    # or in the i-th semi-maximum period (maximum=False) of every sequence.
+    # Both periods start after the first instance of prefix[:i - 1]. The
+    # maximum period ends at the i-th last-in-last appearance, the
+    # semi-maximum period at the i-th last-in-first appearance.
+    (seqs, indexes, _) = sdb
+    periods = []
+    for (sid, offset) in pdb:
+        index = indexes[sid]
+        last = offset - 1
+        if maximum:
+            last = index[prefix[-1]][-1]
+        ends = [last]
+        for item in reversed(prefix[:-1]):
+            positions = index[item]
+            last = positions[bisect_left(positions, last) - 1]
+            ends.append(last)
+        ends.reverse()
+        starts = []
+        first = -1
+        for item in prefix[:-1]:
+            positions = index[item]
+            first = positions[bisect_left(positions, first + 1)]
+            starts.append(first)
+        starts.insert(0, -1)
+        periods.append((seqs[sid], starts, ends))
+
+    for i in range(len(prefix)):
+        common = None
+        for (sequence, starts, ends) in periods:
+            items = set(sequence[starts[i] + 1:ends[i]])
+            common = items if common is None else common & items
+            if not common:
                 break
-            j += 1
-        if projection:
-            new_sdb.append(projection)
-    return new_sdb
+        if common:
+            return True
+    return False
+
+
+def _pdb_size(sdb, pdb):
+    seqs = sdb[0]
+    return sum(len(seqs[entry[0]]) - entry[1] for entry in pdb)
+
+
+def _split_tasks(sdb, pdb, min_support, workers, freq_seqs, constraints,
+        budget=None):
+    max_length = constraints[2]
+    max_tasks = workers * _SPLIT_FACTOR
+    # A heap of (-size, order, prefix, support, pdb): the largest task is
+    # split first.
+    tasks = []
+    for (item, support) in _local_freq_items(sdb, pdb, min_support,
+            constraints):
+        new_pdb = _project(sdb, pdb, item, constraints)
+        tasks.append((-_pdb_size(sdb, new_pdb), len(tasks), (item,),
+            support, new_pdb))
+    heapq.heapify(tasks)
+    max_size = -sum(task[0] for task in tasks) // max_tasks
+    order = len(tasks)
+
+    # Tasks that cannot be extended under max_length.
+    final_tasks = []
+    while tasks and len(tasks) + len(final_tasks) < max_tasks and \
+            -tasks[0][0] > max_size:
+        (_, _, prefix, support, task_pdb) = heapq.heappop(tasks)
+        if max_length is not None and len(prefix) >= max_length:
+            final_tasks.append((prefix, support, task_pdb))
+            continue
+        # Too large: report the prefix here and hand out its extensions.
+        freq_seqs.add((prefix, support))
+        if budget is not None:
+            budget.check(len(freq_seqs))
+        for (item, item_support) in _local_freq_items(sdb, task_pdb,
+                min_support, constraints):
+            new_pdb = _project(sdb, task_pdb, item, constraints)
+            heapq.heappush(tasks, (-_pdb_size(sdb, new_pdb), order,
+                prefix + (item,), item_support, new_pdb))
+            order += 1
+
+    # Largest first, so the tail of the pool is made of short tasks.
+    tasks.sort()
+    return [task[2:] for task in tasks] + final_tasks
+
+
+def _parallel_freq_seq(sdb, pdb, min_support, workers, freq_seqs,
+        constraints, budget=None):
+    tasks = _split_tasks(sdb, pdb, min_support, workers, freq_seqs,
+            constraints, budget)
+    pool = Pool(workers, _init_worker, (sdb, min_support, constraints))
+    try:
+        for task_freq_seqs in pool.imap_unordered(_mine_task, tasks):
+            freq_seqs.update(task_freq_seqs)
+            if budget is not None:
+                budget.check(len(freq_seqs), force=True)
+    except BaseException:
+        # Do not wait for the remaining tasks.
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+
+_worker_input = None
+
+
+def _init_worker(sdb, min_support, constraints):
+    global _worker_input
+    _worker_input = (sdb, min_support, constraints)
+
+
+def _mine_task(task):
+    (sdb, min_support, constraints) = _worker_input
+    (prefix, support, pdb) = task
+    freq_seqs = set()
+    _freq_seq(sdb, pdb, prefix, support, min_support, freq_seqs,
+            constraints)
+    return freq_seqs
@@ -0,0 +1,299 @@
+'''A transaction store in shared memory for multi-process mining (Python
+3.8+).
+
+The distinct transactions are encoded once, as integer codes, in three flat
+int64 arrays of one `multiprocessing.shared_memory` block: the offsets of
+the transactions, their items and their counts. Workers attach to the block
+by name and read it in place, instead of receiving pickled transactions::
+
+    >>> with shm.TransactionStore.create(transactions) as store:
+    ...     with shm.StorePool(store, workers=4) as pool:
+    ...         reports = pool.map(mine_range, store.split(4))
+
+where ``mine_range(store, (start, stop))`` is a module level function that
+mines, e.g., ``store.relim_input(start, stop)``.
+'''
+from array import array
+from collections import defaultdict
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.util import Finalize
+
+from pymining import itemmining
+
+
+_ITEMSIZE = 8
+
+
+class StoreHandle(object):
+    '''What a worker needs to attach to a store: the name of the shared
+       memory block, the array sizes and the keys of the codes.'''
+
+    def __init__(self, name, size, item_count, keys, frequencies):
+        self.name = name
+        self.size = size
+        self.item_count = item_count
+        self.keys = keys
+        self.frequencies = frequencies
+
+
+class TransactionStore(object):
+    '''Distinct transactions encoded in shared memory.
+
+       The code of a key is its rank in increasing (frequency, key) order,
+       and the codes of a transaction are sorted, i.e., the transactions are
+       stored in the order used by the miners.
+
+       :ivar size: the number of distinct transactions.
+       :ivar keys: the key of each code.
+       :ivar frequencies: {key: frequency}.
+    '''
+
+    def __init__(self, memory, handle, owner):
+        self._memory = memory
+        self.handle = handle
+        self.owner = owner
+        self._closed = False
+        self._unlinked = False
+        self.size = handle.size
+        self.keys = handle.keys
+        self.frequencies = dict(zip(handle.keys, handle.frequencies))
+        self._items = [(frequency, key) for (key, frequency) in
+                zip(handle.keys, handle.frequencies)]
+        length = 2 * handle.size + 1 + handle.item_count
+        self._view = memory.buf[:length * _ITEMSIZE].cast('q')
+        self.offsets = self._view[:handle.size + 1]
+        self.items = self._view[handle.size + 1:handle.size + 1 +
+                handle.item_count]
+        self.counts = self._view[handle.size + 1 + handle.item_count:]
+
+    @classmethod
+    def create(cls, transactions, key_func=None, weighted=False,
+            exclude=None):
+        '''Preprocesses transactions into a new shared memory block.
+
+           The parameters are those of `itemmining.get_relim_input`.
+        '''
+        (baskets, frequencies, _) = itemmining._ingest(transactions,
+                key_func, weighted, exclude)
+        ranked = sorted((frequency, key) for (key, frequency) in
+                frequencies.items())
+        codes = {item: code for (code, item) in enumerate(ranked)}
+
+        offsets = array('q', [0])
+        items = array('q')
+        counts = array('q')
+        for (seq, count) in itemmining._encode(baskets, frequencies):
+            items.extend(codes[item] for item in seq)
+            offsets.append(len(items))
+            counts.append(count)
+
+        size = len(counts)
+        length = 2 * size + 1 + len(items)
+        memory = SharedMemory(create=True, size=max(1, length) * _ITEMSIZE)
+        handle = StoreHandle(memory.name, size, len(items),
+                [key for (_, key) in ranked],
+                [frequency for (frequency, _) in ranked])
+        store = cls(memory, handle, True)
+        store.offsets[:] = offsets
+        store.items[:] = items
+        store.counts[:] = counts
+        return store
+
+    @classmethod
+    def attach(cls, handle):
+        '''Attaches to the store of another process, without copy.'''
+        return cls(SharedMemory(name=handle.name), handle, False)
+
+    def __len__(self):
+        return self.size
+
+    def transaction_count(self, start=0, stop=None):
+        '''Returns the number of transactions (with duplicates) between two
+           distinct transactions.'''
+        return sum(self.counts[start:stop])
+
+    def split(self, chunks):
+        '''Returns [(start, stop)] ranges of distinct transactions of
+           (almost) equal size.'''
+        chunks = max(1, min(chunks, self.size))
+        (size, extra) = divmod(self.size, chunks)
+        ranges = []
+        start = 0
+        for i in range(chunks):
+            stop = start + size + (1 if i < extra else 0)
+            ranges.append((start, stop))
+            start = stop
+        return ranges
+
+    def codes(self, index):
+        '''Returns the codes of a distinct transaction.'''
+        return self.items[self.offsets[index]:self.offsets[index + 1]]
+
+    def iter_transactions(self, start=0, stop=None):
+        '''Yields the (count, keys) of the distinct transactions, i.e.,
+           weighted transactions.'''
+        if stop is None:
+            stop = self.size
+        keys = self.keys
+        for index in range(start, stop):
+            yield (self.counts[index], [keys[code] for code in
+                self.codes(index)])
+
+    def baskets(self, start=0, stop=None):
+        '''Returns the distinct transactions in a range, for the input
+           builders of `itemmining`.'''
+        return StoreBaskets(self, start, self.size if stop is None else stop)
+
+    def relim_input(self, start=0, stop=None, min_support=None):
+        '''Returns the input of `itemmining.relim` for a range of
+           distinct transactions.'''
+        return itemmining._build_relim_input(self.baskets(start, stop),
+                self.frequencies, min_support)
+
+    def sam_input(self, start=0, stop=None, min_support=None):
+        '''Returns the input of `itemmining.sam` for a range of distinct
+           transactions.'''
+        return itemmining._build_sam_input(self.baskets(start, stop),
+                self.frequencies, min_support)
+
+    def fptree(self, start=0, stop=None, min_support=2):
+        '''Returns the input of `itemmining.fpgrowth` for a range of
+           distinct transactions.'''
+        return itemmining._build_fptree(self.baskets(start, stop),
+                self.frequencies, min_support)
+
+    def close(self):
+        '''Releases the views and detaches from the shared memory. Calling
+           it again does nothing.'''
+        if self._closed:
+            return
+        for view in (self.offsets, self.items, self.counts, self._view):
+            view.release()
+        self._memory.close()
+        self._closed = True
+
+    def unlink(self):
+        '''Destroys the shared memory block. Only the creator should call
+           it. Calling it again does nothing.'''
+        if self._unlinked:
+            return
+        self._memory.unlink()
+        self._unlinked = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        if self.owner:
+            self.unlink()
+
+
+class StoreBaskets(object):
+    '''A range of the distinct transactions of a store. It has the
+       `encode` method used by the input builders of `itemmining`.'''
+
+    def __init__(self, store, start, stop):
+        self.store = store
+        self.start = start
+        self.stop = stop
+
+    def encode(self, min_support=None, reverse=False):
+        store = self.store
+        items = store._items
+        if not min_support:
+            encoded = []
+            for index in range(self.start, self.stop):
+                seq = tuple(items[code] for code in store.codes(index))
+                encoded.append((seq[::-1] if reverse else seq,
+                    store.counts[index]))
+            return encoded
+
+        # Removing items can make two transactions equal.
+        encoded = defaultdict(int)
+        for index in range(self.start, self.stop):
+            seq = tuple(items[code] for code in store.codes(index) if
+                    items[code][0] >= min_support)
+            if seq:
+                encoded[seq[::-1] if reverse else seq] += store.counts[index]
+        return list(encoded.items())
+
+    def items(self):
+        return ((tuple(keys), count) for (count, keys) in
+                self.store.iter_transactions(self.start, self.stop))
+
+    def values(self):
+        return self.store.counts[self.start:self.stop].tolist()
+
+    def __len__(self):
+        return self.stop - self.start
+
+
+_worker_store = None
+
+
+def _attach_worker(handle):
+    global _worker_store
+    _worker_store = TransactionStore.attach(handle)
+    # The views must be released before SharedMemory.__del__ runs, when a
+    # spawned worker exits.
+    Finalize(None, _worker_store.close, exitpriority=10)
+
+
+def get_worker_store():
+    '''Returns the store attached by the current `StorePool` worker.'''
+    return _worker_store
+
+
+def _call(task):
+    (func, argument) = task
+    return func(_worker_store, argument)
+
+
+class StorePool(object):
+    '''A process pool whose workers are attached to a store. Used as a
+       context manager, it closes the pool and, if the store was created in
+       this process, destroys the store on exit.'''
+
+    def __init__(self, store, workers=None, unlink=True, context=None):
+        '''
+           :param store: a `TransactionStore`.
+           :param workers: the number of processes. Default to the number
+            of CPUs.
+           :param unlink: destroy the store on exit.
+           :param context: a `multiprocessing` context, e.g.,
+            `multiprocessing.get_context('spawn')`. Default to the default
+            start method.
+        '''
+        self.store = store
+        self.workers = workers
+        self.unlink = unlink
+        self.context = context or multiprocessing
+        self.pool = None
+
+    def __enter__(self):
+        self.pool = self.context.Pool(self.workers, _attach_worker,
+                (self.store.handle,))
+        return self
+
+    def map(self, func, arguments):
+        '''Returns [func(store, argument)] computed by the workers. func
+           must be a module level function.'''
+        return self.pool.map(_call, [(func, argument) for argument in
+            arguments])
+
+    def imap_unordered(self, func, arguments):
+        '''Like `map`, but yields the results as they are computed.'''
+        return self.pool.imap_unordered(_call, [(func, argument) for
+            argument in arguments])
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.pool.close()
+        else:
+            self.pool.terminate()
+        self.pool.join()
+        if self.unlink and self.store.owner:
+            self.store.close()
+            self.store.unlink()
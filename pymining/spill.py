@@ -0,0 +1,100 @@
+'''Conditional databases written to disk when mining under a memory limit.
+
+The miners estimate the size of each conditional database before building
+it. If it does not fit in the memory left, they write its transactions to a
+temporary file instead and mine it after the rest of the search, when the
+databases of the recursion have been freed. The files are read back through
+`mmap`, one batch of transactions at a time.
+'''
+from collections import deque
+import mmap
+import os
+import pickle
+import shutil
+import tempfile
+
+
+class SpillQueue(object):
+    '''The conditional databases waiting on disk.
+
+       :ivar live: the estimated size, in bytes, of the conditional
+        databases in memory.
+       :ivar spilled: the number of databases written to disk.
+       :ivar spilled_bytes: the number of bytes written to disk.
+    '''
+
+    def __init__(self, memory_limit, directory=None, batch_size=1024):
+        '''
+           :param memory_limit: the estimated size, in bytes, that the
+            conditional databases in memory may take.
+           :param directory: where to create the temporary files. Default to
+            the directory of `tempfile`.
+           :param batch_size: the number of transactions pickled together.
+        '''
+        self.memory_limit = memory_limit
+        self.directory = directory
+        self.batch_size = batch_size
+        self.live = 0
+        self.spilled = 0
+        self.spilled_bytes = 0
+        self._paths = deque()
+        self._tempdir = None
+
+    def over(self, size):
+        '''Returns True if a database of `size` bytes does not fit.'''
+        return self.live + size > self.memory_limit
+
+    def push(self, header, records):
+        '''Writes a database to disk.
+
+           :param header: what the miner needs to resume, e.g., the item set
+            of the database.
+           :param records: an iterable of the transactions of the database.
+        '''
+        if self._tempdir is None:
+            self._tempdir = tempfile.mkdtemp(prefix='pymining-',
+                    dir=self.directory)
+        (fd, path) = tempfile.mkstemp(suffix='.spill', dir=self._tempdir)
+        with os.fdopen(fd, 'wb') as output_file:
+            pickle.dump(header, output_file, pickle.HIGHEST_PROTOCOL)
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    pickle.dump(batch, output_file, pickle.HIGHEST_PROTOCOL)
+                    batch = []
+            if batch:
+                pickle.dump(batch, output_file, pickle.HIGHEST_PROTOCOL)
+            self.spilled_bytes += output_file.tell()
+        self._paths.append(path)
+        self.spilled += 1
+
+    def __iter__(self):
+        '''Yields the (header, records) of the databases on disk, including
+           those pushed during the iteration. The records of a database
+           must be consumed before the next database is read; its file is
+           then deleted.'''
+        while self._paths:
+            path = self._paths.popleft()
+            with open(path, 'rb') as input_file:
+                data = mmap.mmap(input_file.fileno(), 0,
+                        access=mmap.ACCESS_READ)
+            try:
+                header = pickle.load(data)
+                yield (header, _records(data))
+            finally:
+                data.close()
+                os.remove(path)
+
+    def close(self):
+        '''Deletes the files that were not read.'''
+        if self._tempdir is not None:
+            shutil.rmtree(self._tempdir, ignore_errors=True)
+            self._tempdir = None
+        self._paths.clear()
+
+
+def _records(data):
+    while data.tell() < data.size():
+        for record in pickle.load(data):
+            yield record
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pymining import affinity, itemmining
+
+
+art_string = "Radiohead,Pulp,Morrissey,Delays,Stereophonics,Blur,Suede,Sleeper,The La's,Super Furry Animals\n Band of Horses,Iggy Pop,The Velvet Underground,Radiohead,The Decemberists,Morrissey,Television\nRadiohead,Morrissey\nRadiohead,The Decemberists\nDelays,Blur\n"
+
+
+class TestAffinity(unittest.TestCase):
+
+    def test_mine_pairs(self):
+        ts = list(affinity.parse_lines(art_string.split('\n')))
+        self.assertEqual(5, len(ts))
+        self.assertEqual('Band of Horses', ts[1][0])
+        (pairs, frequencies, total) = affinity.mine_pairs(ts, 2)
+        self.assertEqual({frozenset(['Blur', 'Delays']): 2,
+            frozenset(['Radiohead', 'Morrissey']): 3,
+            frozenset(['Radiohead', 'The Decemberists']): 2}, pairs)
+        self.assertEqual(4, frequencies['Radiohead'])
+        self.assertEqual(5, total)
+
+        report = itemmining.relim(itemmining.get_relim_input(ts), 1,
+                max_length=2)
+        self.assertEqual(2, max(len(itemset) for itemset in report))
+
+        # Streamed: a generator is read into a list, and an iterable is
+        # read twice.
+        self.assertEqual((pairs, frequencies, total), affinity.mine_pairs(
+            iter(ts), 2))
+
+        class Twice(object):
+            reads = 0
+
+            def __iter__(self):
+                Twice.reads += 1
+                return iter(ts + [('Blur', 'Blur', 'Delays')])
+        (pairs, frequencies, total) = affinity.mine_pairs(Twice(), 2,
+                key_func=str.lower)
+        self.assertEqual(2, Twice.reads)
+        self.assertEqual(3, pairs[frozenset(['blur', 'delays'])])
+        self.assertEqual(3, frequencies['blur'])
+        self.assertEqual(6, total)
+
+    def test_scores(self):
+        ts = list(affinity.parse_lines(art_string.split('\n')))
+        (pairs, frequencies, total) = affinity.mine_pairs(ts, 2)
+        scores = {(s.first, s.second): s for s in affinity.score_pairs(pairs,
+            frequencies, total)}
+        score = scores[('Morrissey', 'Radiohead')]
+        self.assertEqual(3, score.support)
+        self.assertEqual(1.0, score.confidence)
+        self.assertEqual(0.75, score.reverse_confidence)
+        self.assertEqual(3.0 * 5 / (3 * 4), score.lift)
+        self.assertEqual(3.0 / 4, score.jaccard)
+
+        table = affinity.similar_artists(ts, 2, top_n=1, score='jaccard')
+        self.assertEqual([(0.75, 'Morrissey')], table['Radiohead'])
+        table = affinity.similar_artists(ts, 2, top_n=5,
+                score='confidence')
+        self.assertEqual([(0.75, 'Morrissey'), (0.5, 'The Decemberists')],
+                table['Radiohead'])
+        self.assertEqual([(1.0, 'Radiohead')], table['Morrissey'])
+        self.assertRaises(ValueError, affinity.top_similar, [], 1, 'foo')
+
+    def test_read_user_artists(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'artists.txt')
+            with open(path, 'w') as output:
+                output.write(art_string)
+            transactions = affinity.read_user_artists(path)
+            self.assertEqual(list(transactions), list(transactions))
+            table = affinity.similar_artists(transactions, 2)
+            self.assertEqual(['Blur', 'Delays', 'Morrissey', 'Radiohead',
+                'The Decemberists'], sorted(table))
+        finally:
+            shutil.rmtree(directory)
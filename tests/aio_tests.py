@@ -0,0 +1,119 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import time
+import unittest
+from pymining import aio, itemmining, perftesting
+from pymining.aio import AsyncMiner
+
+
+run = asyncio.run
+
+
+class TestAsyncMiner(unittest.TestCase):
+
+    def test_relim(self):
+        ts = perftesting.get_default_transactions()
+        expected = itemmining.relim(itemmining.get_relim_input(ts), 2)
+        miner = AsyncMiner()
+        self.addCleanup(miner.close)
+        self.assertEqual(expected, run(miner.relim(ts, 2)))
+        self.assertEqual(expected, run(miner.mine(ts, 2)))
+        rules = run(miner.mine_assoc_rules(expected, 2, 0.5))
+        self.assertTrue(len(rules) > 0)
+
+        async def collect():
+            return [result async for result in miner.iter_relim(ts, 2)]
+        results = run(collect())
+        self.assertEqual(len(expected), len(results))
+        self.assertEqual(expected, dict(results))
+
+        def fail(item):
+            raise ValueError(item)
+
+        async def collect_failure():
+            return [r async for r in miner.iter_relim(ts, 2, key_func=fail)]
+        self.assertRaises(ValueError, run, collect_failure())
+
+        report = run(miner.relim(ts, 2, max_results=3))
+        self.assertFalse(report.complete)
+        self.assertEqual(3, len(report))
+
+    def test_process_executor(self):
+        ts = perftesting.get_default_transactions()
+        expected = itemmining.relim(itemmining.get_relim_input(ts), 2)
+        with ProcessPoolExecutor(1) as executor:
+            miner = AsyncMiner(executor)
+            self.assertEqual(expected, run(miner.relim(ts, 2)))
+
+            async def collect():
+                return [r async for r in miner.iter_relim(ts, 2)]
+            self.assertEqual(expected, dict(run(collect())))
+
+    def test_cancel(self):
+        # All subsets of 40 items are frequent: the search never ends.
+        ts = [list(range(40))] * 3
+        miner = AsyncMiner(max_jobs=1, check_interval=16)
+        self.addCleanup(miner.close)
+
+        async def cancel_job():
+            task = asyncio.ensure_future(miner.relim(ts, 2))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            # The slot is free again once the worker has stopped.
+            start = time.time()
+            report = await miner.relim(perftesting.get_default_transactions(),
+                    2)
+            return (report, time.time() - start)
+
+        (report, seconds) = run(cancel_job())
+        self.assertEqual(17, len(report))
+        self.assertTrue(seconds < 5)
+
+        async def stop_early():
+            async for result in miner.iter_relim(ts, 2):
+                break
+            return await miner.relim(ts[:1], 1, max_results=5)
+        self.assertEqual(5, len(run(stop_early())))
+
+    def test_close(self):
+        ts = perftesting.get_default_transactions()
+
+        async def mine():
+            async with AsyncMiner() as miner:
+                report = await miner.relim(ts, 2)
+            return (miner, report)
+        (miner, report) = run(mine())
+        self.assertEqual(17, len(report))
+        self.assertRaises(RuntimeError, miner.executor.submit, len, ts)
+
+        with ProcessPoolExecutor(1) as executor:
+            AsyncMiner(executor).close()
+            self.assertEqual(3, executor.submit(len, ts[:3]).result())
+
+    def test_backpressure(self):
+        # All subsets of 40 items are frequent: the search never ends.
+        ts = [list(range(40))] * 3
+        sent = []
+        setitem = aio._StreamingReport.__setitem__
+
+        def counting_setitem(report, itemset, support):
+            sent.append(itemset)
+            setitem(report, itemset, support)
+
+        async def consume_slowly():
+            async with AsyncMiner(queue_size=4) as miner:
+                async for result in miner.iter_relim(ts, 2):
+                    await asyncio.sleep(0.2)
+                    return len(sent)
+
+        aio._StreamingReport.__setitem__ = counting_setitem
+        try:
+            count = run(consume_slowly())
+        finally:
+            aio._StreamingReport.__setitem__ = setitem
+        # The item set being consumed, 4 in the queue and 1 waiting.
+        self.assertTrue(count <= 6, count)
@@ -0,0 +1,98 @@
+import random
+import unittest
+from pymining import affinity, arrays, itemmining, partition
+from pymining.compat import numpy
+
+
+def random_transactions(seed, number=300, universe=12):
+    rand = random.Random(seed)
+    return [rand.sample(range(universe), rand.randint(0, 6)) for _ in
+            range(number)]
+
+
+@unittest.skipIf(numpy is None, 'requires numpy')
+class TestArrays(unittest.TestCase):
+
+    def matrices(self, ts, universe=12):
+        dense = numpy.zeros((len(ts), universe), dtype=bool)
+        for (i, t) in enumerate(ts):
+            dense[i, t] = True
+        indptr = numpy.cumsum([0] + [len(t) for t in ts])
+        indices = numpy.array([item for t in ts for item in t],
+                dtype=numpy.int64)
+        return [dense, dense.astype(int), arrays.CSR(indptr, indices)]
+
+    def test_is_matrix(self):
+        ts = random_transactions(0)
+        for matrix in self.matrices(ts):
+            self.assertTrue(arrays.is_matrix(matrix))
+        self.assertFalse(arrays.is_matrix(ts))
+        self.assertFalse(arrays.is_matrix((('a', 'b'), ('b',))))
+        # Two transactions, not CSR.
+        self.assertFalse(arrays.is_matrix((numpy.array([0, 2]),
+            numpy.array([5, 7]))))
+        self.assertRaises(ValueError, itemmining.get_relim_input,
+                arrays.CSR(numpy.array([1, 2]), numpy.array([5, 7])))
+        self.assertRaises(ValueError, itemmining.get_relim_input,
+                arrays.CSR(numpy.array([0, 2, 1, 2]), numpy.array([5, 7])))
+        (indptr, indices) = arrays.to_csr(self.matrices(ts)[0])
+        self.assertEqual(sum(len(t) for t in ts), len(indices))
+        self.assertEqual(sorted(ts[3]),
+                indices[indptr[3]:indptr[4]].tolist())
+
+    def test_engines(self):
+        names = 'abcdefghijkl'
+        for seed in range(3):
+            ts = random_transactions(seed)
+            named = [[names[i] for i in t] for t in ts]
+            for support in (5, 20):
+                expected = itemmining.relim(itemmining.get_relim_input(named),
+                        support)
+                for matrix in self.matrices(ts):
+                    self.assertEqual(expected, itemmining.relim(
+                        itemmining.get_relim_input(matrix, names.__getitem__),
+                        support))
+                    self.assertEqual(expected, itemmining.sam(
+                        itemmining.get_sam_input(matrix, names.__getitem__,
+                            min_support=support), support))
+                    self.assertEqual(expected, itemmining.fpgrowth(
+                        itemmining.get_fptree(matrix, names.__getitem__,
+                            min_support=support), support))
+                    self.assertEqual(expected, itemmining.mine(matrix,
+                        support, key_func=names.__getitem__))
+
+        ts = random_transactions(5)
+        self.assertEqual(itemmining.relim(itemmining.get_relim_input(ts,
+            exclude={1, 2}), 5), itemmining.relim(itemmining.get_relim_input(
+                self.matrices(ts)[2], exclude={1, 2}), 5))
+        stats = itemmining.get_dataset_stats(self.matrices(ts)[0])
+        self.assertEqual(itemmining.get_dataset_stats(ts), stats)
+
+    def test_pair_counts(self):
+        ts = random_transactions(1)
+        for support in (2, 10, 30):
+            expected = {itemset: count for (itemset, count) in
+                    itemmining.relim(itemmining.get_relim_input(ts),
+                        support).items() if len(itemset) == 2}
+            self.assertEqual(expected, affinity.mine_pairs(ts, support)[0])
+            for matrix in self.matrices(ts):
+                self.assertEqual(affinity.mine_pairs(ts, support),
+                        affinity.mine_pairs(matrix, support))
+            self.assertEqual(expected, arrays.pair_counts(
+                self.matrices(ts)[0], support, block_size=50))
+
+    def test_son(self):
+        ts = random_transactions(2)
+        for support in (5, 20):
+            expected = itemmining.relim(itemmining.get_relim_input(ts),
+                    support)
+            for matrix in self.matrices(ts):
+                self.assertEqual(expected, partition.son(matrix, support,
+                    chunks=3))
+                self.assertEqual(expected, partition.son(matrix, support,
+                    chunks=2, workers=2))
+        chunks = partition.split(self.matrices(ts)[0], 4)
+        self.assertEqual([75] * 4, [arrays.row_count(c) for c in chunks])
+        self.assertEqual([sorted(t) for t in ts[75:150]],
+                [c.indices[c.indptr[i]:c.indptr[i + 1]].tolist() for c in
+                    chunks[1:2] for i in range(75)])
@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import unittest
+from pymining import assocrules, benchmark, itemmining, perftesting
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_measure(self):
+        result = benchmark.measure(lambda: [1, 2, 3], warmup=1, repeats=4)
+        self.assertEqual(4, len(result['times']))
+        self.assertEqual(3, result['result_count'])
+        self.assertTrue(result['min'] <= result['median'] <= result['max'])
+        self.assertTrue(result['iqr'] >= 0)
+
+    def test_assocrules_cache(self):
+        for ts in (perftesting.get_default_transactions(),
+                [['a', 'b'], ['a', 'b'], ['c']]):
+            # A new list each time, possibly at the address of the last one.
+            ts = list(ts)
+            expected = assocrules.mine_assoc_rules(itemmining.relim(
+                itemmining.get_relim_input(ts), 2), 2)
+            self.assertEqual(expected, benchmark.ENGINES['assocrules'](ts,
+                2))
+
+    def test_run_benchmarks(self):
+        ts = [tuple(t) for t in perftesting.get_default_transactions()]
+        results = benchmark.run_benchmarks({'default': (ts, 2)}, warmup=0,
+                repeats=2)
+        self.assertEqual(len(benchmark.ENGINES), len(results['results']))
+        counts = {r['engine']: r['result_count'] for r in
+                results['results']}
+        self.assertEqual(17, counts['relim'])
+        self.assertEqual(17, counts['fpgrowth'])
+        self.assertEqual(20, counts['assocrules'])
+
+        (handle, path) = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        try:
+            benchmark.save_results(results, path)
+            baseline = benchmark.load_results(path)
+        finally:
+            os.remove(path)
+        self.assertEqual(json.loads(json.dumps(results)), baseline)
+        self.assertEqual([], benchmark.compare(results, baseline))
+
+    def test_compare(self):
+        def result(median, peak_memory):
+            return {'results': [{'engine': 'relim', 'dataset': 'd',
+                'median': median, 'iqr': 0.01, 'peak_memory': peak_memory}]}
+        self.assertEqual([], benchmark.compare(result(1.05, 100),
+            result(1.0, 100)))
+        regressions = benchmark.compare(result(1.5, 200), result(1.0, 100))
+        self.assertEqual([('relim', 'd', 'median', 1.0, 1.5),
+            ('relim', 'd', 'peak_memory', 100, 200)], regressions)
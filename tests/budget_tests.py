@@ -0,0 +1,77 @@
+import threading
+import unittest
+from pymining import itemmining, seqmining, perftesting
+from pymining.budget import Budget, BudgetExceeded, CANCELLED, DEADLINE,\
+        MAX_RESULTS
+
+
+class TestBudget(unittest.TestCase):
+
+    def item_miners(self):
+        ts = perftesting.get_default_transactions()
+        return [
+            lambda b: itemmining.relim(itemmining.get_relim_input(ts), 2,
+                budget=b),
+            lambda b: itemmining.sam(itemmining.get_sam_input(ts), 2,
+                budget=b),
+            lambda b: itemmining.fpgrowth(itemmining.get_fptree(ts), 2,
+                budget=b),
+            ]
+
+    def seq_miners(self):
+        seqs = perftesting.get_default_sequences()
+        return [
+            lambda b: seqmining.freq_seq_enum(seqs, 2, budget=b),
+            lambda b: seqmining.freq_closed_seq_enum(seqs, 2, budget=b),
+            ]
+
+    def test_max_results(self):
+        for miner in self.item_miners() + self.seq_miners():
+            budget = Budget(max_results=3)
+            report = miner(budget)
+            self.assertEqual(3, len(report))
+            self.assertFalse(report.complete)
+            self.assertEqual(MAX_RESULTS, report.reason)
+            self.assertEqual(MAX_RESULTS, budget.reason)
+
+    def test_complete(self):
+        for miner in self.item_miners() + self.seq_miners():
+            report = miner(Budget(timeout=3600, max_results=1000))
+            self.assertTrue(report.complete)
+            self.assertEqual(None, report.reason)
+            self.assertEqual(miner(None), report)
+
+    def test_cancel_and_deadline(self):
+        cancel = threading.Event()
+        cancel.set()
+        for miner in self.item_miners() + self.seq_miners():
+            report = miner(Budget(cancel=cancel))
+            self.assertEqual(0, len(report))
+            self.assertEqual(CANCELLED, report.reason)
+            report = miner(Budget(deadline=0))
+            self.assertEqual(0, len(report))
+            self.assertEqual(DEADLINE, report.reason)
+
+    def test_check_interval(self):
+        cancel = threading.Event()
+        budget = Budget(cancel=cancel, check_interval=2)
+        budget.start()
+        cancel.set()
+        # The token is only checked every other call.
+        budget.check(1)
+        self.assertRaises(BudgetExceeded, budget.check, 2)
+        self.assertEqual(CANCELLED, budget.reason)
+
+    def test_iter_freq_seq(self):
+        seqs = perftesting.get_default_sequences()
+        budget = Budget(max_results=5)
+        self.assertEqual(5, len(list(seqmining.iter_freq_seq(seqs, 2,
+            budget=budget))))
+        self.assertEqual(MAX_RESULTS, budget.reason)
+
+    def test_workers(self):
+        seqs = perftesting.get_default_sequences()
+        report = seqmining.freq_seq_enum(seqs, 2, workers=2,
+                budget=Budget(max_results=1))
+        self.assertFalse(report.complete)
+        self.assertTrue(len(report) >= 1)
@@ -0,0 +1,112 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from pymining import budget, checkpoint, itemmining
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'run.ckpt')
+        rand = random.Random(3)
+        self.ts = [rand.sample('abcdefghij', rand.randint(2, 7)) for _ in
+                range(300)]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _resume(self, mine):
+        expected = list(mine().items())
+        for max_results in (1, 40, 200):
+            os.remove(self.path)
+            report = mine(budget.Budget(max_results=max_results))
+            self.assertFalse(report.complete)
+            # The run was stopped in the middle of an item.
+            self.assertEqual(expected, list(mine().items()))
+            # A completed run is read back.
+            self.assertEqual(expected, list(mine().items()))
+
+    def test_relim(self):
+        relim_input = itemmining.get_relim_input(self.ts)
+        self._resume(lambda budget=None: itemmining.relim(relim_input, 10,
+            budget=budget, checkpoint=self.path))
+
+    def test_fpgrowth(self):
+        fptree = itemmining.get_fptree(self.ts, min_support=10)
+        self._resume(lambda budget=None: itemmining.fpgrowth(fptree, 10,
+            budget=budget, checkpoint=self.path))
+
+    def test_log(self):
+        relim_input = itemmining.get_relim_input(self.ts)
+        expected = itemmining.relim(relim_input, 10, checkpoint=self.path)
+
+        # A record cut by a crash is ignored.
+        with open(self.path, 'r+b') as log:
+            log.truncate(os.path.getsize(self.path) - 5)
+        saved = checkpoint.Checkpoint(self.path, interval=60)
+        self.assertEqual(expected, itemmining.relim(relim_input, 10,
+            checkpoint=saved))
+        self.assertTrue(saved.done > 0)
+
+        self.assertRaises(checkpoint.CheckpointMismatch, itemmining.relim,
+                relim_input, 20, checkpoint=self.path)
+        self.assertRaises(ValueError, itemmining.relim, relim_input, 10,
+                memory_limit=0, checkpoint=self.path)
+
+    def test_reuse(self):
+        relim_input = itemmining.get_relim_input(self.ts)
+        expected = itemmining.relim(relim_input, 10)
+        saved = checkpoint.Checkpoint(self.path)
+        self.assertEqual(expected, itemmining.relim(relim_input, 10,
+            checkpoint=saved))
+        os.remove(self.path)
+        self.assertEqual(expected, itemmining.relim(relim_input, 10,
+            checkpoint=saved))
+        self.assertEqual(expected, itemmining.relim(relim_input, 10,
+            checkpoint=saved))
+
+    def test_other_file(self):
+        relim_input = itemmining.get_relim_input(self.ts)
+        with open(self.path, 'w') as other:
+            other.write('not a checkpoint\n')
+        self.assertRaises(checkpoint.CheckpointMismatch, itemmining.relim,
+                relim_input, 10, checkpoint=self.path)
+        with open(self.path) as other:
+            self.assertEqual('not a checkpoint\n', other.read())
+
+        # An empty file, or a header cut short, is a new log.
+        expected = itemmining.relim(relim_input, 10)
+        open(self.path, 'w').close()
+        self.assertEqual(expected, itemmining.relim(relim_input, 10,
+            checkpoint=self.path))
+        with open(self.path, 'r+b') as log:
+            log.truncate(10)
+        self.assertEqual(expected, itemmining.relim(relim_input, 10,
+            checkpoint=self.path))
+
+    def test_save(self):
+        class Report(dict):
+            def items(self):
+                raise AssertionError('the whole report is read')
+
+        saved = checkpoint.Checkpoint(self.path)
+        report = Report()
+        saved.open('run', report)
+        logged = saved.logged(report)
+        logged[frozenset('a')] = 3
+        saved.save(1)
+        logged[frozenset('b')] = 2
+        saved.save(2)
+        # The item being mined is not completed.
+        logged[frozenset('bc')] = 2
+        saved.close()
+        self.assertEqual(3, len(report))
+
+        resumed = checkpoint.Checkpoint(self.path)
+        report = {}
+        self.assertEqual(2, resumed.open('run', report))
+        resumed.close()
+        self.assertEqual({frozenset('a'): 3, frozenset('b'): 2}, report)
@@ -0,0 +1,36 @@
+import random
+import unittest
+from pymining import counting, itemmining, perftesting
+
+
+class TestCounting(unittest.TestCase):
+
+    def test_count_supports(self):
+        rand = random.Random(4)
+        ts = [rand.sample('abcdefghij', rand.randint(1, 6)) for _ in
+                range(300)]
+        report = itemmining.relim(itemmining.get_relim_input(ts), 5)
+        self.assertEqual(report, counting.count_supports(report, ts))
+
+        candidates = [('a', 'b'), 'c', (), ('a', 'z'), ('j', 'a', 'b')]
+        supports = counting.count_supports(candidates, ts)
+        for candidate in candidates:
+            expected = sum(1 for t in ts if set(candidate) <= set(t))
+            self.assertEqual(expected, supports[frozenset(candidate)])
+
+        weighted = [(3, 'abc'), (2, 'bc'), (7, 'ad'), (1, '')]
+        index = counting.VerticalIndex(weighted, weighted=True)
+        self.assertEqual(13, index.size)
+        self.assertEqual(5, index.support('bc'))
+        self.assertEqual(10, index.support('a'))
+        self.assertEqual(0, index.support('ab' + 'd'))
+        self.assertEqual({frozenset('c'): 5, frozenset(): 13},
+                index.supports(['c', '']))
+
+    def test_default_transactions(self):
+        ts = perftesting.get_default_transactions()
+        report = itemmining.relim(itemmining.get_relim_input(ts), 2)
+        index = counting.VerticalIndex(ts)
+        self.assertEqual(report, index.supports(report))
+        self.assertEqual(report, {itemset: index.support(itemset) for
+            itemset in report})
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pymining import eventlog, itemmining, perftesting
+
+
+class TestEventLog(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, rows):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as output:
+            output.write('user,item\n')
+            for row in rows:
+                output.write(','.join(row) + '\n')
+        return path
+
+    def rows(self):
+        ts = perftesting.get_default_transactions()
+        return [('u{0:02d}'.format(i), item) for (i, t) in enumerate(ts) for
+                item in t]
+
+    def test_group_events(self):
+        rows = [('1', 'a'), ('1', 'b'), ('2', 'a'), ('3', 'c'), ('3', 'c')]
+        self.assertEqual([['a', 'b'], ['a'], ['c', 'c']],
+                list(eventlog.group_events(rows)))
+        self.assertEqual([('1', ['a', 'b']), ('2', ['a']), ('3', ['c', 'c'])],
+                list(eventlog.group_events(rows, with_keys=True)))
+        shuffled = [rows[2], rows[0], rows[3], rows[1]]
+        self.assertEqual([['a'], ['a', 'b'], ['c']],
+                list(eventlog.group_partition(shuffled)))
+
+    def test_event_log(self):
+        rows = self.rows()
+        ts = perftesting.get_default_transactions()
+        expected = itemmining.relim(itemmining.get_relim_input(ts), 2)
+
+        # A sorted log split in the middle of a user.
+        paths = [self.write('a.csv', rows[:5]), self.write('b.csv',
+            rows[5:])]
+        log = eventlog.EventLog(paths, skip_header=True)
+        self.assertEqual([list(t) for t in ts], list(log))
+        self.assertEqual(expected, itemmining.relim(
+            itemmining.get_relim_input(log), 2))
+        self.assertEqual(expected, itemmining.mine(log, 2))
+
+        # Partitions by user, unsorted.
+        users = sorted({row[0] for row in rows})
+        partitions = [[row for row in reversed(rows) if row[0] in
+            users[i::2]] for i in range(2)]
+        paths = [self.write('p{0}.csv'.format(i), partition) for (i,
+            partition) in enumerate(partitions)]
+        log = eventlog.EventLog(paths, skip_header=True, is_sorted=False)
+        self.assertEqual(len(ts), len(list(log)))
+        self.assertEqual(expected, itemmining.sam(itemmining.get_sam_input(
+            log), 2))
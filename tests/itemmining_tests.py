@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+import random
 import unittest
 from pymining import itemmining, perftesting
 
@@ -55,3 +57,213 @@ class TestItemSetAlgo(unittest.TestCase):
         report = itemmining.fpgrowth(fp_input, 2, pruning=False)
         self.assertEqual(19, len(report))
         self.assertEqual(5, report[frozenset(['a', 'b'])])
+
+    def test_support_sweep(self):
+        itemmining.clear_sweep_cache()
+        ts1 = perftesting.get_default_transactions()
+        reports = itemmining.support_sweep(ts1, [5, 2, 3])
+        self.assertEqual([2, 3, 5], sorted(reports))
+        for support in (2, 3, 5):
+            relim_input = itemmining.get_relim_input(ts1)
+            self.assertEqual(itemmining.relim(relim_input, support),
+                    reports[support])
+        self.assertEqual(17, len(reports[2]))
+
+        # Same data, higher supports: answered from the cache.
+        self.assertEqual(1, len(itemmining._sweep_cache))
+        reports = itemmining.support_sweep(list(ts1), [4, 6])
+        self.assertEqual(1, len(itemmining._sweep_cache))
+        relim_input = itemmining.get_relim_input(ts1)
+        self.assertEqual(itemmining.relim(relim_input, 4), reports[4])
+
+        # Lower support than cached: mined again.
+        reports = itemmining.support_sweep(ts1, [1])
+        relim_input = itemmining.get_relim_input(ts1)
+        self.assertEqual(itemmining.relim(relim_input, 1), reports[1])
+        self.assertEqual(1,
+                list(itemmining._sweep_cache.values())[0].min_support)
+
+    def test_mining_stats(self):
+        ts1 = perftesting.get_default_transactions()
+        miners = [
+            lambda stats: itemmining.relim(itemmining.get_relim_input(ts1),
+                3, stats=stats),
+            lambda stats: itemmining.sam(itemmining.get_sam_input(ts1), 3,
+                stats=stats),
+            lambda stats: itemmining.fpgrowth(itemmining.get_fptree(ts1), 3,
+                stats=stats),
+            lambda stats: itemmining.fpgrowth(itemmining.get_fptree(ts1), 3,
+                pruning=True, stats=stats),
+            ]
+        for miner in miners:
+            calls = []
+            stats = itemmining.MiningStats(
+                    lambda item, seconds, stats: calls.append(item))
+            report = miner(stats)
+            self.assertEqual(len(report), sum(stats.nodes_per_depth.values()))
+            singletons = {next(iter(s)) for s in report if len(s) == 1}
+            self.assertEqual(singletons, set(stats.top_level_times))
+            self.assertEqual(list(stats.top_level_times), calls)
+            self.assertEqual(len(report), stats.peak_results)
+            self.assertTrue(stats.items_pruned > 0)
+            self.assertTrue(stats.max_cond_db_size > 0)
+            self.assertEqual(len(singletons), len(stats.hot_items(100)))
+
+    def test_mine(self):
+        ts = perftesting.get_default_transactions()
+        expected = itemmining.relim(itemmining.get_relim_input(ts), 2)
+        self.assertEqual(expected, itemmining.mine(ts, 2))
+        for engine in ('relim', 'sam', 'fpgrowth'):
+            self.assertEqual(expected, itemmining.mine(ts, 2, engine=engine))
+
+        stats = itemmining.get_dataset_stats([{1, 2}, {2, 1}, {3}, {1}])
+        self.assertEqual(4, stats['size'])
+        self.assertEqual(3, stats['items'])
+        self.assertEqual(0.25, stats['duplicate_rate'])
+        self.assertEqual(1.5 / 3, stats['density'])
+        selection = {'density_threshold': 0.3, 'duplicate_threshold': 0.2,
+                'engines': {'sparse': 'relim', 'sparse_duplicated': 'sam',
+                    'dense': 'fpgrowth', 'dense_duplicated': 'sam'}}
+        self.assertEqual('sam', itemmining.select_engine(stats, selection))
+        stats['duplicate_rate'] = 0.0
+        self.assertEqual('fpgrowth', itemmining.select_engine(stats,
+            selection))
+
+    def test_calibrate(self):
+        selection = itemmining.calibrate(densities=(0.05, 0.3),
+                duplicate_rates=(0.0, 0.5), size=60, repeats=1, apply=False)
+        self.assertTrue(0.05 < selection['density_threshold'] < 0.3)
+        self.assertTrue(0.0 < selection['duplicate_threshold'] < 0.5)
+        for engine in selection['engines'].values():
+            self.assertTrue(engine in ('relim', 'sam', 'fpgrowth'))
+
+    def test_weighted_input(self):
+        ts = perftesting.get_default_transactions()
+        weighted = [(3, t) for t in ts] + [(2, ts[0])]
+        expanded = [t for t in ts for _ in range(3)] + [ts[0], ts[0]]
+        for support in (2, 7, 12):
+            expected = itemmining.relim(itemmining.get_relim_input(expanded),
+                    support)
+            self.assertEqual(expected, itemmining.relim(
+                itemmining.get_relim_input(weighted, weighted=True), support))
+            self.assertEqual(expected, itemmining.sam(
+                itemmining.get_sam_input(weighted, weighted=True), support))
+            self.assertEqual(expected, itemmining.fpgrowth(
+                itemmining.get_fptree(weighted, min_support=support,
+                    weighted=True), support))
+        sam_input = itemmining.get_sam_input([(5, 'ab'), (2, 'ba')],
+                weighted=True)
+        self.assertEqual(1, len(sam_input))
+        self.assertEqual(7, sam_input[0][0])
+
+    def test_ingestion(self):
+        ts = perftesting.get_default_transactions() * 3
+        calls = []
+
+        def key_func(item):
+            calls.append(item)
+            return item
+
+        stats = itemmining.IngestionStats()
+        relim_input = itemmining.get_relim_input(ts, key_func=key_func,
+                min_support=13, ingestion_stats=stats)
+        self.assertEqual(sum(len(t) for t in ts), len(calls))
+        self.assertEqual(30, stats.records)
+        self.assertEqual(30, stats.transactions)
+        self.assertEqual(8, stats.unique)
+        self.assertEqual(3, stats.items)
+        self.assertTrue(stats.baskets_per_second > 0)
+        expected = itemmining.relim(itemmining.get_relim_input(ts), 13)
+        self.assertEqual(expected, itemmining.relim(relim_input, 13))
+        self.assertEqual(expected, itemmining.sam(itemmining.get_sam_input(
+            ts, min_support=13), 13))
+
+        # The same parameter name as in mine().
+        for get_input in (itemmining.get_sam_input, itemmining.get_fptree):
+            other = itemmining.IngestionStats()
+            get_input(ts, min_support=13, ingestion_stats=other)
+            self.assertEqual((30, 8, 3), (other.transactions, other.unique,
+                other.items))
+        other = itemmining.IngestionStats()
+        itemmining.mine(ts, 13, ingestion_stats=other)
+        self.assertEqual((30, 8), (other.transactions, other.unique))
+
+    def test_include_exclude(self):
+        rand = random.Random(0)
+        ts = [rand.sample('abcdefghij', rand.randint(1, 6)) for _ in
+                range(200)]
+        full = itemmining.relim(itemmining.get_relim_input(ts), 10)
+        for include in (['a'], ['b', 'c'], ['a', 'b', 'c', 'd', 'e']):
+            expected = {itemset: support for (itemset, support) in
+                    full.items() if itemset.issuperset(include)}
+            self.assertEqual(expected, itemmining.relim(
+                itemmining.get_relim_input(ts), 10, include=include))
+            self.assertEqual(expected, itemmining.sam(
+                itemmining.get_sam_input(ts), 10, include=include))
+            self.assertEqual(expected, itemmining.fpgrowth(
+                itemmining.get_fptree(ts, min_support=10), 10,
+                include=include))
+            self.assertEqual(expected, itemmining.mine(ts, 10,
+                include=include))
+        self.assertEqual({}, itemmining.relim(itemmining.get_relim_input(ts),
+            10, include=['z']))
+
+        # The top level items are those that follow the included keys.
+        expected = set(key for itemset in full if 'a' in itemset and
+                len(itemset) == 2 for key in itemset) - set('a')
+        for mine in (lambda stats: itemmining.relim(
+                    itemmining.get_relim_input(ts), 10, stats=stats,
+                    include=['a']),
+                lambda stats: itemmining.sam(itemmining.get_sam_input(ts),
+                    10, stats=stats, include=['a']),
+                lambda stats: itemmining.fpgrowth(itemmining.get_fptree(ts,
+                    min_support=10), 10, stats=stats, include=['a'])):
+            top_items = []
+            stats = itemmining.MiningStats(callback=lambda item, seconds,
+                    stats: top_items.append(item))
+            mine(stats)
+            self.assertEqual(expected, set(stats.top_level_times))
+            self.assertEqual(expected, set(top_items))
+
+        exclude = {'a', 'c'}
+        expected = {itemset: support for (itemset, support) in full.items()
+                if not itemset.intersection(exclude)}
+        self.assertEqual(expected, itemmining.relim(
+            itemmining.get_relim_input(ts, exclude=exclude), 10))
+        self.assertEqual(expected, itemmining.sam(
+            itemmining.get_sam_input(ts, exclude=exclude), 10))
+        self.assertEqual(expected, itemmining.fpgrowth(
+            itemmining.get_fptree(ts, min_support=10, exclude=exclude), 10))
+        self.assertEqual(expected, itemmining.mine(ts, 10, exclude=exclude))
+
+    def test_relim_input_reuse(self):
+        rand = random.Random(1)
+        ts = [rand.sample('abcdefghij', rand.randint(1, 6)) for _ in
+                range(200)]
+        relim_input = itemmining.get_relim_input(ts)
+        expected = {support: itemmining.relim(itemmining.get_relim_input(ts),
+            support) for support in (5, 10, 20)}
+        for support in (5, 10, 20, 5):
+            self.assertEqual(expected[support], itemmining.relim(relim_input,
+                support))
+        with ThreadPoolExecutor(4) as executor:
+            reports = list(executor.map(lambda support: itemmining.relim(
+                relim_input, support), [5, 10, 20] * 4))
+        self.assertEqual([expected[5], expected[10], expected[20]] * 4,
+                reports)
+
+    def test_memory_limit(self):
+        rand = random.Random(2)
+        ts = [rand.sample('abcdefghijkl', rand.randint(3, 9)) for _ in
+                range(300)]
+        relim_input = itemmining.get_relim_input(ts)
+        fptree = itemmining.get_fptree(ts, min_support=10)
+        expected = itemmining.relim(relim_input, 10)
+        for memory_limit in (0, 5000, 10 ** 9):
+            self.assertEqual(expected, itemmining.relim(relim_input, 10,
+                memory_limit=memory_limit))
+            for pruning in (False, True):
+                self.assertEqual(expected, itemmining.fpgrowth(fptree, 10,
+                    pruning, memory_limit=memory_limit))
+        self.assertEqual(expected, itemmining.mine(ts, 10, engine='relim',
+            memory_limit=0))
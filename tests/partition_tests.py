@@ -0,0 +1,36 @@
+import random
+import unittest
+from pymining import itemmining, partition, perftesting
+
+
+class TestPartition(unittest.TestCase):
+
+    def test_split(self):
+        chunks = partition.split(range(10), 3)
+        self.assertEqual([4, 3, 3], [len(chunk) for chunk in chunks])
+        self.assertEqual(list(range(10)), sum(chunks, []))
+        self.assertEqual(2, len(partition.split([1, 2], 5)))
+        self.assertEqual(3, partition.local_support(10, 25, 100))
+        self.assertEqual(2, partition.local_support(10, 20, 100))
+
+    def test_son(self):
+        rand = random.Random(0)
+        ts = [rand.sample('abcdefghij', rand.randint(1, 6)) for _ in
+                range(200)]
+        for support in (5, 20, 60):
+            expected = itemmining.relim(itemmining.get_relim_input(ts),
+                    support)
+            for chunks in (1, 3, 7):
+                self.assertEqual(expected, partition.son(ts, support,
+                    chunks=chunks))
+            self.assertEqual(expected, partition.son(ts, support,
+                workers=2, chunks=4))
+
+        ts = perftesting.get_default_transactions()
+        chunks = partition.split(ts, 2)
+        candidates = partition.merge_candidates(partition.mine_chunk(chunk,
+            2, len(ts)) for chunk in chunks)
+        report = partition.merge_counts((partition.count_support(chunk,
+            candidates) for chunk in chunks), 2)
+        self.assertEqual(itemmining.relim(itemmining.get_relim_input(ts), 2),
+                report)
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from pymining import itemmining, perftesting
+from pymining.compat import numpy
+
+
+@unittest.skipIf(numpy is None, 'requires numpy')
+class TestGenerators(unittest.TestCase):
+
+    def test_zipf_transactions(self):
+        ts = perftesting.get_zipf_transactions(2000, universe_size=100,
+                avg_length=5, seed=1, batch_size=300)
+        self.assertEqual(2000, len(ts))
+        self.assertEqual(ts, perftesting.get_zipf_transactions(2000,
+            universe_size=100, avg_length=5, seed=1, batch_size=300))
+        for transaction in ts:
+            self.assertEqual(len(set(transaction)), len(transaction))
+            self.assertTrue(all(0 <= item < 100 for item in transaction))
+        frequencies = itemmining.get_frequencies(ts)
+        # Zipf: the first item is the most popular.
+        self.assertEqual(max(frequencies.values()), frequencies[0])
+
+    def test_quest_transactions(self):
+        ts = perftesting.get_quest_transactions(1000, universe_size=200,
+                pattern_number=20, seed=2)
+        self.assertEqual(1000, len(ts))
+        report = itemmining.relim(itemmining.get_relim_input(ts), 100)
+        # Patterns make some larger item sets frequent.
+        self.assertTrue(max(len(itemset) for itemset in report) > 1)
+
+    def test_random_sequences(self):
+        seqs = perftesting.get_random_sequences(500, avg_length=8, seed=3)
+        self.assertEqual(500, len(seqs))
+        average = sum(len(seq) for seq in seqs) / float(len(seqs))
+        self.assertTrue(5 < average < 12)
+
+    def test_write_transactions(self):
+        (handle, path) = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            count = perftesting.write_transactions(
+                    perftesting.iter_zipf_transactions(50, seed=4), path)
+            with open(path) as input_file:
+                lines = input_file.read().splitlines()
+        finally:
+            os.remove(path)
+        self.assertEqual(50, count)
+        self.assertEqual([' '.join(str(i) for i in t) for t in
+            perftesting.get_zipf_transactions(50, seed=4)], lines)
@@ -0,0 +1,148 @@
+import random
+import unittest
+from itertools import combinations
+from pymining import seqmining, perftesting
+from pymining.compat import numpy
+
+
+def naive_freq_seqs(sequences, min_support, max_gap=None, max_span=None,
+        max_length=None):
+    counts = {}
+    for sequence in sequences:
+        subsequences = set()
+        for length in range(1, min(len(sequence), max_length or
+                len(sequence)) + 1):
+            for indices in combinations(range(len(sequence)), length):
+                if max_gap is not None and any(j - i > max_gap for (i, j) in
+                        zip(indices, indices[1:])):
+                    continue
+                if max_span is not None and indices[-1] - indices[0] > \
+                        max_span:
+                    continue
+                subsequences.add(tuple(sequence[i] for i in indices))
+        for subsequence in subsequences:
+            counts[subsequence] = counts.get(subsequence, 0) + 1
+    return {(seq, support) for (seq, support) in counts.items() if
+            support >= min_support}
+
+
+def naive_closed_seqs(freq_seqs):
+    def contains(sequence, subsequence):
+        it = iter(sequence)
+        return all(item in it for item in subsequence)
+    return {(seq, support) for (seq, support) in freq_seqs if not any(
+        support == other_support and len(other) == len(seq) + 1 and
+        contains(other, seq) for (other, other_support) in freq_seqs)}
+
+
+def random_sequences(seed, number=30, max_length=7, alphabet='abcde'):
+    rand = random.Random(seed)
+    return [tuple(rand.choice(alphabet) for _ in
+        range(rand.randint(0, max_length))) for _ in range(number)]
+
+
+class TestSeqMining(unittest.TestCase):
+
+    def test_freq_seq_enum(self):
+        seqs = perftesting.get_default_sequences()
+        freq_seqs = seqmining.freq_seq_enum(seqs, 2)
+        self.assertEqual(17, len(freq_seqs))
+        self.assertTrue((('c', 'a', 'b', 'c'), 2) in freq_seqs)
+        self.assertTrue((('a', 'b', 'c'), 4) in freq_seqs)
+        self.assertEqual(naive_freq_seqs(seqs, 2), freq_seqs)
+
+    def test_freq_seq_enum_random(self):
+        for seed in range(5):
+            seqs = random_sequences(seed)
+            for support in (2, 5):
+                self.assertEqual(naive_freq_seqs(seqs, support),
+                        seqmining.freq_seq_enum(seqs, support))
+
+    def test_freq_seq_enum_int_items(self):
+        seqs = [(1, 2, 3), (2, 3), (1, 3, 2)]
+        freq_seqs = seqmining.freq_seq_enum(seqs, 2)
+        self.assertEqual(naive_freq_seqs(seqs, 2), freq_seqs)
+        self.assertTrue(((2, 3), 2) in freq_seqs)
+
+    def test_freq_seq_enum_workers(self):
+        seqs = random_sequences(7, number=200, max_length=12)
+        self.assertEqual(seqmining.freq_seq_enum(seqs, 10),
+                seqmining.freq_seq_enum(seqs, 10, workers=2))
+        seqs = perftesting.get_default_sequences()
+        self.assertEqual(seqmining.freq_seq_enum(seqs, 2),
+                seqmining.freq_seq_enum(seqs, 2, workers=3))
+        seqs = random_sequences(7, number=200, max_length=12, alphabet='abc')
+        self.assertEqual(seqmining.freq_seq_enum(seqs, 10, max_length=2),
+                seqmining.freq_seq_enum(seqs, 10, workers=2, max_length=2))
+
+        # Dense sequences: the projections barely shrink, so the number of
+        # tasks is what stops the split.
+        rand = random.Random(0)
+        seqs = [[rand.choice('abcde') for _ in range(30)] for _ in
+                range(200)]
+        sdb = seqmining._get_seq_input(seqs)
+        constraints = seqmining._NO_CONSTRAINTS
+        freq_seqs = set()
+        tasks = seqmining._split_tasks(sdb, seqmining._initial_pdb(sdb,
+            constraints), 100, 4, freq_seqs, constraints)
+        # The last split adds at most one task per item.
+        self.assertTrue(len(tasks) < 4 * seqmining._SPLIT_FACTOR + 5)
+        self.assertTrue(len(freq_seqs) < 5)
+
+    def test_freq_seq_enum_constraints(self):
+        constraints = [{'max_gap': 1}, {'max_gap': 2}, {'max_span': 3},
+                {'max_length': 2}, {'max_gap': 2, 'max_span': 3},
+                {'max_gap': 3, 'max_length': 3}]
+        for seed in range(3):
+            seqs = random_sequences(seed, max_length=9, alphabet='abc')
+            for kwargs in constraints:
+                self.assertEqual(naive_freq_seqs(seqs, 3, **kwargs),
+                        seqmining.freq_seq_enum(seqs, 3, **kwargs))
+        seqs = random_sequences(7, number=200, max_length=12)
+        self.assertEqual(seqmining.freq_seq_enum(seqs, 10, max_gap=2),
+                seqmining.freq_seq_enum(seqs, 10, workers=2, max_gap=2))
+
+    def test_freq_closed_seq_enum(self):
+        seqs = perftesting.get_default_sequences()
+        closed_seqs = seqmining.freq_closed_seq_enum(seqs, 2)
+        self.assertEqual(naive_closed_seqs(naive_freq_seqs(seqs, 2)),
+                closed_seqs)
+        self.assertTrue((('c', 'a', 'b', 'c'), 2) in closed_seqs)
+        self.assertFalse((('a', 'c'), 4) in closed_seqs)
+        for seed in range(10):
+            seqs = random_sequences(seed, max_length=9, alphabet='abcd')
+            for support in (2, 4, 8):
+                self.assertEqual(
+                        naive_closed_seqs(naive_freq_seqs(seqs, support)),
+                        seqmining.freq_closed_seq_enum(seqs, support))
+
+    @unittest.skipIf(numpy is None, 'requires numpy')
+    def test_spade(self):
+        seqs = perftesting.get_default_sequences()
+        self.assertEqual(seqmining.freq_seq_enum(seqs, 2),
+                seqmining.spade(seqs, 2))
+        for seed in range(5):
+            seqs = random_sequences(seed)
+            for support in (1, 2, 5):
+                self.assertEqual(naive_freq_seqs(seqs, support),
+                        seqmining.spade(seqs, support))
+        self.assertEqual(set(), seqmining.spade([], 1))
+
+    def test_iter_freq_seq(self):
+        seqs = perftesting.get_default_sequences()
+        freq_seqs = list(seqmining.iter_freq_seq(seqs, 2))
+        self.assertEqual(17, len(freq_seqs))
+        self.assertEqual(seqmining.freq_seq_enum(seqs, 2), set(freq_seqs))
+        # Depth-first: a sequence comes after its prefix.
+        seen = set()
+        for (seq, _) in freq_seqs:
+            self.assertTrue(len(seq) == 1 or seq[:-1] in seen)
+            seen.add(seq)
+
+        seqs = random_sequences(3, max_length=9, alphabet='abc')
+        self.assertEqual(naive_freq_seqs(seqs, 3, max_gap=2),
+                set(seqmining.iter_freq_seq(seqs, 3, max_gap=2)))
+
+        iterator = seqmining.iter_freq_seq(seqs, 1)
+        first = [next(iterator) for _ in range(5)]
+        self.assertEqual(5, len(set(first)))
@@ -0,0 +1,105 @@
+import multiprocessing
+import os
+import random
+import tempfile
+import unittest
+from pymining import itemmining, partition, perftesting, shm
+
+
+def _support_range(store, task):
+    (start, stop) = task
+    return itemmining.relim(store.relim_input(start, stop), 2)
+
+
+def _attached_size(store, _):
+    return (os.getpid(), len(store), store.transaction_count())
+
+
+def _worker_errors(func):
+    # Returns what func and the processes it starts write to stderr.
+    with tempfile.TemporaryFile() as output:
+        saved = os.dup(2)
+        os.dup2(output.fileno(), 2)
+        try:
+            func()
+        finally:
+            os.dup2(saved, 2)
+            os.close(saved)
+        output.seek(0)
+        return output.read().decode()
+
+
+class TestSharedMemory(unittest.TestCase):
+
+    def test_store(self):
+        ts = perftesting.get_default_transactions()
+        expected = itemmining.relim(itemmining.get_relim_input(ts), 2)
+        with shm.TransactionStore.create(ts) as store:
+            self.assertEqual(len(ts), store.transaction_count())
+            self.assertEqual(sorted(sorted(t) for t in ts), sorted(
+                sorted(keys) for (count, keys) in store.iter_transactions()
+                for _ in range(count)))
+            self.assertEqual(expected, itemmining.relim(
+                store.relim_input(), 2))
+            self.assertEqual(expected, itemmining.sam(store.sam_input(), 2))
+            self.assertEqual(expected, itemmining.fpgrowth(store.fptree(),
+                2))
+
+            attached = shm.TransactionStore.attach(store.handle)
+            self.assertEqual(list(store.counts), list(attached.counts))
+            self.assertEqual(expected, itemmining.relim(
+                attached.relim_input(min_support=2), 2))
+            attached.close()
+
+    def test_pool(self):
+        rand = random.Random(0)
+        ts = [rand.sample('abcdefghij', rand.randint(1, 6)) for _ in
+                range(200)]
+        store = shm.TransactionStore.create(ts)
+        with shm.StorePool(store, 2) as pool:
+            sizes = pool.map(_attached_size, range(4))
+            self.assertEqual(set([(len(store), 200)]),
+                    set(size[1:] for size in sizes))
+            reports = pool.map(_support_range, store.split(3))
+        self.assertEqual(len(store), sum(len(range(*r)) for r in
+            store.split(3)))
+        self.assertTrue(all(reports))
+        # The pool destroyed the store.
+        self.assertRaises(FileNotFoundError, shm.TransactionStore.attach,
+                store.handle)
+
+        # The usage of the module documentation.
+        with shm.TransactionStore.create(ts) as store:
+            with shm.StorePool(store, workers=2) as pool:
+                reports = pool.map(_support_range, store.split(2))
+        self.assertEqual(2, len(reports))
+        store.close()
+        store.unlink()
+
+        for support in (5, 20):
+            self.assertEqual(itemmining.relim(itemmining.get_relim_input(ts),
+                support), partition.son(ts, support, chunks=4, workers=2,
+                    shared=True))
+
+    def test_spawn(self):
+        # Spawned workers run the exit handlers that forked workers skip.
+        rand = random.Random(0)
+        ts = [rand.sample('abcdefghij', rand.randint(1, 6)) for _ in
+                range(200)]
+        context = multiprocessing.get_context('spawn')
+        expected = itemmining.relim(itemmining.get_relim_input(ts), 5)
+        results = []
+
+        def run_pool():
+            with shm.TransactionStore.create(ts) as store:
+                with shm.StorePool(store, 2, context=context) as pool:
+                    results.append(pool.map(_support_range, store.split(2)))
+
+        def run_son():
+            results.append(partition.son(ts, 5, chunks=4, workers=2,
+                shared=True, context=context))
+
+        self.assertEqual('', _worker_errors(run_pool))
+        self.assertEqual('', _worker_errors(run_son))
+        self.assertEqual(2, len(results[0]))
+        self.assertEqual(expected, results[1])
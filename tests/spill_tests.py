@@ -0,0 +1,29 @@
+import os
+import unittest
+from pymining import spill
+
+
+class TestSpill(unittest.TestCase):
+
+    def test_queue(self):
+        queue = spill.SpillQueue(100, batch_size=3)
+        self.assertFalse(queue.over(100))
+        self.assertTrue(queue.over(101))
+        queue.push('first', [(1, (2,)), (3, (4, 5))] * 4)
+        queue.push('second', [])
+        directory = queue._tempdir
+        self.assertEqual(2, len(os.listdir(directory)))
+
+        read = []
+        for (header, records) in queue:
+            read.append((header, list(records)))
+            if header == 'first':
+                queue.push('third', [(6, ())])
+        self.assertEqual([('first', [(1, (2,)), (3, (4, 5))] * 4),
+            ('second', []), ('third', [(6, ())])], read)
+        self.assertEqual(3, queue.spilled)
+        self.assertEqual([], os.listdir(directory))
+
+        queue.push('unread', [(1, ())])
+        queue.close()
+        self.assertFalse(os.path.exists(directory))